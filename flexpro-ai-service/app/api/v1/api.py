@@ -5,7 +5,7 @@ Combines all API endpoints
 
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import workout, diet, health, auth, exercises_extended, workouts, foods_extended, supplements
+from app.api.v1.endpoints import workout, diet, health, auth, exercises_extended, workouts, foods_extended, supplements, coach, admin
 
 api_router = APIRouter()
 
@@ -29,6 +29,12 @@ api_router.include_router(
     tags=["workouts"]
 )
 
+api_router.include_router(
+    coach.router,
+    prefix="/coach",
+    tags=["coach"]
+)
+
 api_router.include_router(
     foods_extended.router,
     prefix="/foods",
@@ -54,7 +60,15 @@ api_router.include_router(
     tags=["diet-generation"]
 )
 
+# Health checks: /health, /health/live and /health/ready
 api_router.include_router(
     health.router,
     tags=["health"]
-)
\ No newline at end of file
+)
+
+# Admin diagnostics (super admins only)
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"]
+)
@@ -0,0 +1,73 @@
+"""
+Admin Endpoints
+Diagnostics for live workers (super admins only)
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiler import profile_for, render_profile, request_profiles
+from app.core.security import require_super_admin
+from app.models.sql_models import User
+
+router = APIRouter()
+
+PROFILE_FORMATS = "^(collapsed|speedscope)$"
+
+
+def _profile_response(sampler, output: str, name: str):
+    profile = render_profile(sampler, output, name)
+    if output == "speedscope":
+        return JSONResponse(profile, headers={"Content-Disposition": 'attachment; filename="profile.speedscope.json"'})
+    return PlainTextResponse(profile)
+
+
+@router.get("/profile")
+async def profile_worker(
+    seconds: float = Query(5.0, gt=0, description="Sampling duration in seconds"),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000, description="Milliseconds between samples"),
+    output: str = Query("collapsed", alias="format", pattern=PROFILE_FORMATS, description="collapsed or speedscope"),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Sample this worker's threads for a number of seconds
+
+    The event loop keeps serving requests while sampling, so the profile
+    shows the worker's real load. Only the worker that receives this
+    request is profiled.
+
+    Returns:
+        Collapsed stacks (for flamegraph.pl) or a speedscope JSON file
+    """
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}")
+
+    interval = (interval_ms or settings.PROFILER_INTERVAL_MS) / 1000
+    sampler = await profile_for(seconds, interval)
+    return _profile_response(sampler, output, f"worker profile ({seconds:g}s)")
+
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    output: str = Query("collapsed", alias="format", pattern=PROFILE_FORMATS, description="collapsed or speedscope"),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Get the profile of a request sent with the X-Profile header
+
+    Profiles are kept by the worker that served the request; with several
+    workers, send ``X-Profile: <token>;inline`` to get it in the response.
+
+    Returns:
+        Collapsed stacks or a speedscope JSON file
+    """
+    entry = request_profiles.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+
+    name, sampler = entry
+    return _profile_response(sampler, output, name)
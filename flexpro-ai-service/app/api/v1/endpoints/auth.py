@@ -3,18 +3,21 @@ Authentication Endpoints
 Handles user registration and login
 """
 
+import secrets
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr
 from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.db.database import get_db
 from app.models.sql_models import User
-from app.core.auth import verify_password, get_password_hash, create_access_token, decode_access_token
+from app.core.auth import verify_password_async, get_password_hash_async, create_access_token
+from app.core.security import get_current_user
 
 router = APIRouter()
-security = HTTPBearer()
+
+COACH_CODE_BYTES = 5  # 10 hex characters
 
 
 # Request/Response Models
@@ -24,6 +27,7 @@ class UserRegister(BaseModel):
     password: str
     full_name: Optional[str] = None
     role: str = "client"  # 'coach' or 'client'
+    coach_code: Optional[str] = None  # Links a client to their coach
 
 
 class UserLogin(BaseModel):
@@ -44,12 +48,21 @@ class UserResponse(BaseModel):
     full_name: Optional[str]
     role: str
     coach_code: Optional[str]
+    coach_id: Optional[int]
     is_super_admin: int
 
     class Config:
         from_attributes = True
 
 
+def generate_coach_code(db: Session) -> str:
+    """Random code a coach shares with clients so they can register under them"""
+    while True:
+        code = secrets.token_hex(COACH_CODE_BYTES).upper()
+        if not db.query(User.id).filter(User.coach_code == code).first():
+            return code
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """
@@ -82,15 +95,31 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
             detail="Role must be 'coach' or 'client'"
         )
     
+    # Resolve the client's coach (if provided)
+    coach_id = None
+    if user_data.coach_code and user_data.role == "client":
+        coach = db.query(User).filter(
+            User.coach_code == user_data.coach_code,
+            User.role == "coach"
+        ).first()
+        if not coach:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid coach code"
+            )
+        coach_id = coach.id
+    
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     
     new_user = User(
         username=user_data.username,
         email=user_data.email,
         password_hash=hashed_password,
         full_name=user_data.full_name,
-        role=user_data.role
+        role=user_data.role,
+        coach_code=generate_coach_code(db) if user_data.role == "coach" else None,
+        coach_id=coach_id
     )
     
     db.add(new_user)
@@ -141,7 +170,7 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    if not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
@@ -171,40 +200,6 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     }
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """
-    Dependency to get current authenticated user from JWT token
-    
-    Returns:
-        User object
-    
-    Raises:
-        HTTPException: If token is invalid or user not found
-    """
-    token = credentials.credentials
-    
-    try:
-        payload = decode_access_token(token)
-        user_id = int(payload.get("sub"))
-    except (ValueError, KeyError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    
-    return user
-
-
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
@@ -0,0 +1,110 @@
+"""
+Coach Endpoints
+Aggregated views over a coach's clients
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.models.sql_models import User, WorkoutPlan
+from app.api.v1.endpoints.auth import get_current_user
+
+router = APIRouter()
+
+
+class LatestPlanResponse(BaseModel):
+    id: int
+    plan_name: Optional[str]
+    plan_type: Optional[str]
+    day_count: Optional[int]
+    exercise_count: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+class ClientOverviewResponse(BaseModel):
+    id: int
+    username: str
+    full_name: Optional[str]
+    email: Optional[str]
+    plan_count: int
+    last_updated_at: Optional[datetime]
+    latest_plan: Optional[LatestPlanResponse]
+
+
+@router.get("/clients/overview", response_model=List[ClientOverviewResponse])
+async def get_clients_overview(
+    skip: int = Query(0, ge=0, description="Skip N clients"),
+    limit: int = Query(500, le=2000, description="Limit clients"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get every client of the current coach with plan statistics
+
+    Runs as a single query: clients are joined to their plans and window
+    functions compute per-client counts and pick the latest plan.
+
+    Returns:
+        List of client overviews
+    """
+    if current_user.role != "coach":
+        raise HTTPException(status_code=403, detail="Only coaches can access client overviews")
+
+    per_client = {"partition_by": User.id}
+    ranked = select(
+        User.id.label("client_id"),
+        User.username,
+        User.full_name,
+        User.email,
+        func.count(WorkoutPlan.id).over(**per_client).label("plan_count"),
+        func.max(WorkoutPlan.updated_at).over(**per_client).label("last_updated_at"),
+        func.row_number().over(
+            order_by=(WorkoutPlan.created_at.desc(), WorkoutPlan.id.desc()),
+            **per_client
+        ).label("row_number"),
+        WorkoutPlan.id.label("plan_id"),
+        WorkoutPlan.plan_name,
+        WorkoutPlan.plan_type,
+        WorkoutPlan.day_count,
+        WorkoutPlan.exercise_count,
+        WorkoutPlan.created_at.label("plan_created_at"),
+        WorkoutPlan.updated_at.label("plan_updated_at"),
+    ).select_from(User).outerjoin(
+        WorkoutPlan, WorkoutPlan.user_id == User.id
+    ).where(User.coach_id == current_user.id).subquery()
+
+    rows = db.execute(
+        select(ranked)
+        .where(ranked.c.row_number == 1)
+        .order_by(ranked.c.username)
+        .offset(skip)
+        .limit(limit)
+    ).mappings().all()
+
+    return [
+        {
+            "id": row["client_id"],
+            "username": row["username"],
+            "full_name": row["full_name"],
+            "email": row["email"],
+            "plan_count": row["plan_count"],
+            "last_updated_at": row["last_updated_at"],
+            "latest_plan": {
+                "id": row["plan_id"],
+                "plan_name": row["plan_name"],
+                "plan_type": row["plan_type"],
+                "day_count": row["day_count"],
+                "exercise_count": row["exercise_count"],
+                "created_at": row["plan_created_at"],
+                "updated_at": row["plan_updated_at"],
+            } if row["plan_id"] is not None else None,
+        }
+        for row in rows
+    ]
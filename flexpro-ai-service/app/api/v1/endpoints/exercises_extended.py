@@ -9,9 +9,11 @@ from typing import List, Optional
 from pydantic import BaseModel
 
 from app.db.database import get_db
-from app.models.sql_models_extended import Exercise
+from app.models.sql_models import Exercise
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.cache import cache_key, result_cache, row_to_dict
 from app.models.sql_models import User
+from app.services.exercise_alternatives import exercise_alternative_index
 
 router = APIRouter()
 
@@ -39,6 +41,18 @@ class ExerciseResponse(BaseModel):
         from_attributes = True
 
 
+class ExerciseAlternativeResponse(BaseModel):
+    exercise: ExerciseResponse
+    score: float
+
+
+def _split_csv(value: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated query parameter into a list"""
+    if not value:
+        return None
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
 @router.get("/", response_model=List[ExerciseResponse])
 async def get_exercises(
     category: Optional[str] = Query(None, description="Filter by category"),
@@ -56,28 +70,35 @@ async def get_exercises(
     Returns:
         List of exercises
     """
-    query = db.query(Exercise)
-    
-    # Apply filters
-    if category:
-        query = query.filter(Exercise.category == category)
-    if difficulty:
-        query = query.filter(Exercise.difficulty == difficulty)
-    if equipment:
-        # Check if equipment is in the JSON array
-        query = query.filter(Exercise.equipment.contains([equipment]))
-    if muscle_group:
-        # Check if muscle group is in primary or secondary muscles
-        query = query.filter(
-            (Exercise.primary_muscles.contains([muscle_group])) |
-            (Exercise.secondary_muscles.contains([muscle_group]))
-        )
-    if search:
-        query = query.filter(Exercise.name.ilike(f"%{search}%"))
-    
-    exercises = query.order_by(Exercise.name).offset(skip).limit(limit).all()
+    key = cache_key(
+        "exercises:list", category=category, difficulty=difficulty, equipment=equipment,
+        muscle_group=muscle_group, search=search, skip=skip, limit=limit
+    )
+
+    def load():
+        query = db.query(Exercise)
+        
+        # Apply filters
+        if category:
+            query = query.filter(Exercise.category == category)
+        if difficulty:
+            query = query.filter(Exercise.difficulty == difficulty)
+        if equipment:
+            # Check if equipment is in the JSON array
+            query = query.filter(Exercise.equipment.contains([equipment]))
+        if muscle_group:
+            # Check if muscle group is in primary or secondary muscles
+            query = query.filter(
+                (Exercise.primary_muscles.contains([muscle_group])) |
+                (Exercise.secondary_muscles.contains([muscle_group]))
+            )
+        if search:
+            query = query.filter(Exercise.name.ilike(f"%{search}%"))
+        
+        exercises = query.order_by(Exercise.name).offset(skip).limit(limit).all()
+        return [row_to_dict(exercise) for exercise in exercises]
     
-    return exercises
+    return await result_cache.get_or_set(key, load, tags=["exercises"])
 
 
 @router.get("/{exercise_id}", response_model=ExerciseResponse)
@@ -91,9 +112,49 @@ async def get_exercise(
     Returns:
         Exercise details
     """
-    exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
-    
-    if not exercise:
-        raise HTTPException(status_code=404, detail="Exercise not found")
+    def load():
+        exercise = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+        
+        if not exercise:
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        
+        return row_to_dict(exercise)
     
-    return exercise
+    return await result_cache.get_or_set(cache_key("exercises:get", id=exercise_id), load, tags=["exercises"])
+
+
+@router.get("/{exercise_id}/alternatives", response_model=List[ExerciseAlternativeResponse])
+async def get_exercise_alternatives(
+    exercise_id: str,
+    equipment: Optional[str] = Query(None, description="Available equipment (comma-separated)"),
+    exclude_injury: Optional[str] = Query(None, description="Injuries to work around (comma-separated)"),
+    k: int = Query(5, ge=1, le=50, description="Number of alternatives"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get ranked substitutes for an exercise
+
+    Returns:
+        List of alternative exercises with similarity scores
+    """
+    exercise_alternative_index.ensure_built(db)
+
+    ranked = exercise_alternative_index.alternatives(
+        exercise_id,
+        equipment=_split_csv(equipment),
+        exclude_injuries=_split_csv(exclude_injury),
+        k=k
+    )
+    if not ranked:
+        if not db.query(Exercise.id).filter(Exercise.id == exercise_id).first():
+            raise HTTPException(status_code=404, detail="Exercise not found")
+        return []
+
+    exercises = db.query(Exercise).filter(Exercise.id.in_([ex_id for ex_id, _ in ranked])).all()
+    by_id = {exercise.id: exercise for exercise in exercises}
+
+    return [
+        {"exercise": by_id[ex_id], "score": score}
+        for ex_id, score in ranked
+        if ex_id in by_id
+    ]
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from app.db.database import get_db
 from app.models.sql_models_extended import Food
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.cache import cache_key, result_cache, row_to_dict
 from app.models.sql_models import User
 
 router = APIRouter()
@@ -48,17 +49,21 @@ async def get_foods(
     Returns:
         List of foods
     """
-    query = db.query(Food)
-    
-    # Apply filters
-    if category:
-        query = query.filter(Food.category == category)
-    if search:
-        query = query.filter(Food.name.ilike(f"%{search}%"))
-    
-    foods = query.order_by(Food.name).offset(skip).limit(limit).all()
+    key = cache_key("foods:list", category=category, search=search, skip=skip, limit=limit)
+
+    def load():
+        query = db.query(Food)
+        
+        # Apply filters
+        if category:
+            query = query.filter(Food.category == category)
+        if search:
+            query = query.filter(Food.name.ilike(f"%{search}%"))
+        
+        foods = query.order_by(Food.name).offset(skip).limit(limit).all()
+        return [row_to_dict(food) for food in foods]
     
-    return foods
+    return await result_cache.get_or_set(key, load, tags=["foods"])
 
 
 @router.get("/{food_id}", response_model=FoodResponse)
@@ -72,9 +77,12 @@ async def get_food(
     Returns:
         Food details
     """
-    food = db.query(Food).filter(Food.id == food_id).first()
-    
-    if not food:
-        raise HTTPException(status_code=404, detail="Food not found")
+    def load():
+        food = db.query(Food).filter(Food.id == food_id).first()
+        
+        if not food:
+            raise HTTPException(status_code=404, detail="Food not found")
+        
+        return row_to_dict(food)
     
-    return food
+    return await result_cache.get_or_set(cache_key("foods:get", id=food_id), load, tags=["foods"])
@@ -1,17 +1,229 @@
 """
 Health check endpoints
+Liveness and readiness probes with budgeted dependency checks, served under /api/v1
 """
 
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import anyio
 from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.auth import password_hash_pool
+from app.core.cache import result_cache
+from app.core.config import settings
+from app.db.database import DATABASE_PATH, Base, engine
 
 router = APIRouter()
 
+# SQLite WAL file layout: a fixed header, then one header per frame
+WAL_HEADER_BYTES = 32
+WAL_FRAME_HEADER_BYTES = 24
+
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint
+
+    The readiness verdict without the per-check detail.
+    """
+    ready, _ = await _readiness_report()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "healthy" if ready else "degraded",
+            "service": "FlexPro AI Service",
+            "version": "1.0.0"
+        },
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@router.get("/health/live")
+async def liveness():
+    """
+    Liveness probe
+
+    Answers as long as the event loop is serving requests; restart the
+    worker if this fails.
+    """
+    return {"status": "alive"}
+
+
+def _check_database() -> Dict[str, Any]:
+    # Reading the schema needs a shared lock, so a locked file shows up here
+    with engine.connect() as conn:
+        conn.execute(text("SELECT count(*) FROM sqlite_master")).scalar()
+    return {}
+
+
+def _check_wal() -> Dict[str, Any]:
+    # Read from the file rather than with a checkpoint pragma, so a probe
+    # never does checkpoint I/O
+    wal_path = DATABASE_PATH.with_name(DATABASE_PATH.name + "-wal")
+    try:
+        with open(wal_path, "rb") as f:
+            header = f.read(WAL_HEADER_BYTES)
+            wal_bytes = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return {"wal_bytes": 0, "wal_frames": 0}
+
+    frames = 0
+    if len(header) == WAL_HEADER_BYTES:
+        page_size = int.from_bytes(header[8:12], "big")
+        if page_size == 1:  # 65536 doesn't fit the 16-bit on-disk encoding
+            page_size = 65536
+        if page_size:
+            frames = (wal_bytes - WAL_HEADER_BYTES) // (page_size + WAL_FRAME_HEADER_BYTES)
+
+    # Checkpointed frames stay in the file until the next writer restarts
+    # the log, so this is an upper bound on the checkpoint lag
+    return {
+        "wal_bytes": wal_bytes,
+        "wal_frames": frames,
+        "ok": wal_bytes <= settings.HEALTH_WAL_MAX_BYTES and frames <= settings.HEALTH_WAL_MAX_LAG_FRAMES,
+    }
+
+
+def _catalog_snapshot() -> Dict[str, Any]:
+    from app.db.seed import DATASETS, dataset_hash
+    from app.models.sql_models import SeedState
+
+    state = SeedState.__table__
+    with engine.connect() as conn:
+        rows = conn.execute(
+            state.select().with_only_columns(state.c.dataset, state.c.content_hash, state.c.seeded_at)
+            .order_by(state.c.dataset)
+        ).fetchall()
+
+    digest = hashlib.sha256()
+    for dataset, content_hash, _ in rows:
+        digest.update(f"{dataset}:{content_hash};".encode("utf-8"))
+
+    # Only a seeded dataset whose data file has since changed fails the
+    # check; datasets that were never seeded are reported
+    seeded = {dataset: content_hash for dataset, content_hash, _ in rows}
+    stale = [
+        name for name, _, _ in DATASETS
+        if name in seeded and seeded[name] != dataset_hash(name, Base.metadata.tables[name])
+    ]
+    return {
+        "version": digest.hexdigest()[:12] if rows else None,
+        "datasets": {dataset: content_hash[:12] for dataset, content_hash, _ in rows},
+        "seeded_at": max((seeded_at for _, _, seeded_at in rows if seeded_at), default=None),
+        "stale": stale,
+        "unseeded": [name for name, _, _ in DATASETS if name not in seeded],
+        "ok": not stale,
+    }
+
+
+async def _check_cache() -> Dict[str, Any]:
+    if result_cache.redis is None:
+        return {"backend": "local"}
+    await result_cache.redis.ping()
+    return {"backend": "redis"}
+
+
+async def _pool_saturation() -> Dict[str, Any]:
+    # A coroutine so the thread limiter is read on the event loop
+    stats = password_hash_pool.stats()
+    capacity = stats["workers"] + stats["max_queue"]
+    hash_saturation = (stats["in_flight"] + stats["queue_depth"]) / capacity if capacity else 0.0
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    thread_saturation = limiter.borrowed_tokens / limiter.total_tokens if limiter.total_tokens else 0.0
+
     return {
-        "status": "healthy",
-        "service": "FlexPro AI Service",
-        "version": "1.0.0"
-    }
\ No newline at end of file
+        "password_hash_saturation": round(hash_saturation, 3),
+        "password_hash_queue_depth": stats["queue_depth"],
+        "threadpool_saturation": round(thread_saturation, 3),
+        "ok": max(hash_saturation, thread_saturation) < settings.HEALTH_POOL_MAX_SATURATION,
+    }
+
+
+async def _run_check(check: Callable[[], Any], budget_ms: float) -> Dict[str, Any]:
+    """Run a check within its time budget; failing or running over budget marks it not ok"""
+    started = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(check):
+            awaitable: Awaitable = check()
+        else:
+            awaitable = run_in_threadpool(check)
+        result = await asyncio.wait_for(awaitable, timeout=budget_ms / 1000)
+    except asyncio.TimeoutError:
+        result = {"ok": False, "error": "timed out"}
+    except Exception as e:
+        result = {"ok": False, "error": str(e)}
+
+    duration_ms = (time.perf_counter() - started) * 1000
+    ok = result.pop("ok", True) and duration_ms <= budget_ms
+    return {"ok": ok, "duration_ms": round(duration_ms, 2), "budget_ms": budget_ms, **result}
+
+
+_report_lock = asyncio.Lock()
+_cached_report: Optional[Tuple[float, Tuple[bool, Dict[str, Any]]]] = None
+
+
+async def _readiness_report() -> Tuple[bool, Dict[str, Any]]:
+    """
+    The readiness verdict and per-check detail
+
+    Probes are unauthenticated and not rate limited, so concurrent and
+    back-to-back probes share one report for HEALTH_REPORT_TTL_SECONDS.
+    """
+    global _cached_report
+
+    async with _report_lock:
+        if _cached_report is not None and time.monotonic() < _cached_report[0]:
+            return _cached_report[1]
+        report = await _build_readiness_report()
+        _cached_report = (time.monotonic() + settings.HEALTH_REPORT_TTL_SECONDS, report)
+        return report
+
+
+async def _build_readiness_report() -> Tuple[bool, Dict[str, Any]]:
+    budget = settings.HEALTH_CHECK_BUDGET_MS
+    checks = {
+        "database": _check_database,
+        "wal": _check_wal,
+        "cache": _check_cache,
+        "pools": _pool_saturation,
+        "catalog": _catalog_snapshot,
+    }
+    budgets = {"database": settings.HEALTH_DB_BUDGET_MS, "cache": settings.HEALTH_CACHE_BUDGET_MS}
+
+    results = await asyncio.gather(*(
+        _run_check(check, budgets.get(name, budget)) for name, check in checks.items()
+    ))
+    report = dict(zip(checks, results))
+    return all(result["ok"] for result in report.values()), report
+
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Readiness probe
+
+    Checks the database, its write-ahead log, the cache backend, worker
+    pool saturation and that the seeded catalog still matches the data
+    files, each within a time budget. Returns 503 when any check fails so load
+    balancers stop routing to this worker.
+    """
+    ready, report = await _readiness_report()
+
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=jsonable_encoder({
+            "status": "ready" if ready else "degraded",
+            "checks": report,
+        }),
+        headers={"Cache-Control": "no-store"},
+    )
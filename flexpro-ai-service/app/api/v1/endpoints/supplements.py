@@ -5,13 +5,15 @@ Handles supplement data retrieval
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, validator
 
 from app.db.database import get_db
 from app.models.sql_models import Supplement
 from app.api.v1.endpoints.auth import get_current_user
+from app.core.cache import cache_key, result_cache, row_to_dict
 from app.models.sql_models import User
+from app.services.supplement_graph import CONFLICT, SYNERGY, supplement_graph
 
 router = APIRouter()
 
@@ -47,6 +49,58 @@ class SupplementResponse(BaseModel):
         from_attributes = True
 
 
+class StackValidationRequest(BaseModel):
+    supplements: List[str]  # Ids, supplement_ids or names
+    conditions: List[str] = []  # Health conditions to check contraindications against
+
+    @validator("supplements", "conditions", each_item=True)
+    def not_blank(cls, value: str) -> str:
+        if not value.strip():
+            raise ValueError("must not be empty")
+        return value
+
+
+class StackMember(BaseModel):
+    id: int
+    supplement_id: str
+    name: str
+
+
+class StackPair(BaseModel):
+    first: StackMember
+    second: StackMember
+
+
+class StackWarning(BaseModel):
+    supplement: StackMember
+    detail: str
+
+
+class StackValidationResponse(BaseModel):
+    valid: bool
+    supplements: List[StackMember]
+    unknown: List[str]
+    conflicts: List[StackPair]
+    synergies: List[StackPair]
+    interaction_warnings: List[StackWarning]
+    contraindications: List[StackWarning]
+
+
+class StackableResponse(BaseModel):
+    supplement: StackMember
+    synergies: List[StackMember]
+    conflicts: List[StackMember]
+    interaction_warnings: List[str]
+    contraindications: List[str]
+
+
+def _stack_member(supplement_id: int) -> Optional[Dict]:
+    node = supplement_graph.node(supplement_id)
+    if node is None:
+        return None
+    return {"id": node.id, "supplement_id": node.supplement_id, "name": node.name}
+
+
 @router.get("/", response_model=List[SupplementResponse])
 async def get_supplements(
     category: Optional[str] = Query(None, description="Filter by category (creatine, protein, etc.)"),
@@ -63,25 +117,32 @@ async def get_supplements(
     Returns:
         List of supplements
     """
-    query = db.query(Supplement)
+    key = cache_key(
+        "supplements:list", category=category, search=search,
+        evidence_level=evidence_level, goal=goal, min_rating=min_rating
+    )
+
+    def load():
+        query = db.query(Supplement)
 
-    # Apply filters
-    if category:
-        query = query.filter(Supplement.category == category)
-    if evidence_level:
-        query = query.filter(Supplement.evidence_level == evidence_level)
-    if search:
-        query = query.filter(Supplement.name.ilike(f"%{search}%"))
-    if goal and hasattr(Supplement, 'goals'):
-        # For JSON array filtering, we'd need more complex logic
-        # This is a simplified version
-        pass
-    if min_rating:
-        query = query.filter(Supplement.scientific_rating >= min_rating)
+        # Apply filters
+        if category:
+            query = query.filter(Supplement.category == category)
+        if evidence_level:
+            query = query.filter(Supplement.evidence_level == evidence_level)
+        if search:
+            query = query.filter(Supplement.name.ilike(f"%{search}%"))
+        if goal and hasattr(Supplement, 'goals'):
+            # For JSON array filtering, we'd need more complex logic
+            # This is a simplified version
+            pass
+        if min_rating:
+            query = query.filter(Supplement.scientific_rating >= min_rating)
 
-    supplements = query.order_by(Supplement.name).all()
+        supplements = query.order_by(Supplement.name).all()
+        return [row_to_dict(supplement) for supplement in supplements]
 
-    return supplements
+    return await result_cache.get_or_set(key, load, tags=["supplements"])
 
 
 @router.get("/{supplement_id}", response_model=SupplementResponse)
@@ -96,12 +157,15 @@ async def get_supplement(
     Returns:
         Supplement details
     """
-    supplement = db.query(Supplement).filter(Supplement.id == supplement_id).first()
+    def load():
+        supplement = db.query(Supplement).filter(Supplement.id == supplement_id).first()
 
-    if not supplement:
-        raise HTTPException(status_code=404, detail="Supplement not found")
+        if not supplement:
+            raise HTTPException(status_code=404, detail="Supplement not found")
 
-    return supplement
+        return row_to_dict(supplement)
+
+    return await result_cache.get_or_set(cache_key("supplements:get", id=supplement_id), load, tags=["supplements"])
 
 
 @router.get("/by-supplement-id/{supplement_id}", response_model=SupplementResponse)
@@ -116,12 +180,16 @@ async def get_supplement_by_supplement_id(
     Returns:
         Supplement details
     """
-    supplement = db.query(Supplement).filter(Supplement.supplement_id == supplement_id).first()
+    def load():
+        supplement = db.query(Supplement).filter(Supplement.supplement_id == supplement_id).first()
 
-    if not supplement:
-        raise HTTPException(status_code=404, detail="Supplement not found")
+        if not supplement:
+            raise HTTPException(status_code=404, detail="Supplement not found")
+
+        return row_to_dict(supplement)
 
-    return supplement
+    key = cache_key("supplements:get", supplement_id=supplement_id)
+    return await result_cache.get_or_set(key, load, tags=["supplements"])
 
 
 @router.get("/categories/", response_model=List[str])
@@ -135,8 +203,11 @@ async def get_supplement_categories(
     Returns:
         List of categories
     """
-    categories = db.query(Supplement.category).distinct().filter(Supplement.category.isnot(None)).all()
-    return [cat[0] for cat in categories]
+    def load():
+        categories = db.query(Supplement.category).distinct().filter(Supplement.category.isnot(None)).all()
+        return [cat[0] for cat in categories]
+
+    return await result_cache.get_or_set("supplements:categories", load, tags=["supplements"])
 
 
 @router.get("/top-rated/", response_model=List[SupplementResponse])
@@ -152,10 +223,94 @@ async def get_top_rated_supplements(
     Returns:
         List of top-rated supplements
     """
-    supplements = db.query(Supplement)\
-        .filter(Supplement.scientific_rating >= min_rating)\
-        .order_by(Supplement.scientific_rating.desc())\
-        .limit(limit)\
-        .all()
+    def load():
+        supplements = db.query(Supplement)\
+            .filter(Supplement.scientific_rating >= min_rating)\
+            .order_by(Supplement.scientific_rating.desc())\
+            .limit(limit)\
+            .all()
+        return [row_to_dict(supplement) for supplement in supplements]
+
+    key = cache_key("supplements:top_rated", limit=limit, min_rating=min_rating)
+    return await result_cache.get_or_set(key, load, tags=["supplements"])
+
+
+@router.post("/stack/validate", response_model=StackValidationResponse)
+async def validate_supplement_stack(
+    request: StackValidationRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Check a proposed supplement stack for conflicts, synergies and contraindications
+
+    Returns:
+        Validation result; the stack is valid when every supplement is known
+        and nothing conflicts or is contraindicated
+    """
+    supplement_graph.ensure_built(db)
+
+    resolved, unknown = [], []
+    for reference in request.supplements:
+        supplement_id = supplement_graph.resolve(reference)
+        if supplement_id is None:
+            unknown.append(reference)
+        else:
+            resolved.append(supplement_id)
+
+    result = supplement_graph.validate(resolved, request.conditions)
+
+    def pairs(edges):
+        return [
+            {"first": _stack_member(first), "second": _stack_member(second)}
+            for first, second in edges
+        ]
+
+    def warnings(items):
+        return [
+            {"supplement": _stack_member(supplement_id), "detail": detail}
+            for supplement_id, detail in items
+        ]
+
+    return {
+        "valid": not (unknown or result["conflicts"] or result["contraindicated"]),
+        "supplements": [_stack_member(supplement_id) for supplement_id in dict.fromkeys(resolved)],
+        "unknown": unknown,
+        "conflicts": pairs(result["conflicts"]),
+        "synergies": pairs(result["synergies"]),
+        "interaction_warnings": warnings(result["warnings"]),
+        "contraindications": warnings(result["contraindicated"]),
+    }
+
+
+@router.get("/{supplement_id}/stackable", response_model=StackableResponse)
+async def get_stackable_supplements(
+    supplement_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the supplements that stack well or conflict with a supplement
+
+    Returns:
+        Synergies, conflicts, interaction warnings and contraindications
+    """
+    supplement_graph.ensure_built(db)
+
+    node = supplement_graph.node(supplement_id)
+    if node is None:
+        raise HTTPException(status_code=404, detail="Supplement not found")
+
+    def members(kind):
+        return sorted(
+            filter(None, (_stack_member(other_id) for other_id in supplement_graph.neighbors(supplement_id, kind))),
+            key=lambda member: member["name"]
+        )
 
-    return supplements
\ No newline at end of file
+    return {
+        "supplement": _stack_member(supplement_id),
+        "synergies": members(SYNERGY),
+        "conflicts": members(CONFLICT),
+        "interaction_warnings": list(supplement_graph.external_interactions(supplement_id)),
+        "contraindications": list(node.contraindications),
+    }
@@ -3,14 +3,26 @@ Workout Plan Endpoints
 Handles workout plan creation and retrieval
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+import codecs
+import json
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, defer, undefer
+from sqlalchemy.orm.exc import StaleDataError
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from datetime import datetime
+from pydantic import BaseModel, ValidationError
 
+from app.core.config import settings
 from app.db.database import get_db
 from app.models.sql_models import WorkoutPlan, User
 from app.api.v1.endpoints.auth import get_current_user
+from app.services.json_patch import JsonPatchError, apply_json_patch, apply_merge_patch
+from app.services.workout_revisions import list_revisions, materialize_revision, record_revision
+from app.services.workout_stats import compute_plan_stats
 
 router = APIRouter()
 
@@ -33,6 +45,7 @@ class WorkoutPlanResponse(BaseModel):
     data: dict
     plan_name: Optional[str]
     plan_type: Optional[str]
+    version: int
     created_at: str
     updated_at: str
 
@@ -40,6 +53,67 @@ class WorkoutPlanResponse(BaseModel):
         from_attributes = True
 
 
+class BulkImportError(BaseModel):
+    index: int
+    detail: Any
+
+
+class BulkCreateResponse(BaseModel):
+    created_ids: List[int]
+    errors: List[BulkImportError]
+
+
+class BulkImportAborted(Exception):
+    """A bulk import stopped part way; plans before ``index`` were created"""
+
+    def __init__(self, status_code: int, detail: str, index: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.index = index
+
+
+class WorkoutPlanSummaryResponse(BaseModel):
+    id: int
+    user_id: int
+    plan_name: Optional[str]
+    plan_type: Optional[str]
+    version: int
+    day_count: Optional[int]
+    exercise_count: Optional[int]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class WorkoutPlanRevisionResponse(BaseModel):
+    version: int
+    is_snapshot: bool
+    created_at: Optional[datetime]
+
+
+class WorkoutPlanVersionResponse(BaseModel):
+    workout_plan_id: int
+    version: int
+    data: dict
+
+
+def _etag(workout_plan: WorkoutPlan) -> str:
+    """Build the ETag header value for a workout plan version"""
+    return f'"{workout_plan.id}-{workout_plan.version}"'
+
+
+def _check_if_match(workout_plan: WorkoutPlan, if_match: Optional[str]) -> None:
+    """Reject the request if the client's ETag is not the current version"""
+    if if_match is None or if_match.strip() == "*":
+        return
+    candidates = {tag.strip().removeprefix("W/") for tag in if_match.split(",")}
+    if _etag(workout_plan) not in candidates:
+        raise HTTPException(status_code=412, detail="Workout plan has been modified")
+
+
 @router.post("/", response_model=WorkoutPlanResponse, status_code=201)
 async def create_workout_plan(
     workout_data: WorkoutPlanCreate,
@@ -66,6 +140,217 @@ async def create_workout_plan(
     return workout_plan
 
 
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+_json_decoder = json.JSONDecoder()
+
+
+async def _iter_json_array(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (index, item) pairs from a JSON array body as it streams in
+
+    Only the item being parsed is held in memory. A malformed item ends the
+    array, since there is no reliable way to find where the next one starts.
+
+    Raises:
+        HTTPException: If the body does not start a JSON array
+        BulkImportAborted: If the array is malformed after its start
+    """
+    chunks = request.stream().__aiter__()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, pos, index, finished = "", 0, 0, False
+
+    async def read_more() -> bool:
+        nonlocal buffer, pos, finished
+        if finished:
+            return False
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            chunk, finished = b"", True
+        try:
+            text = text_decoder.decode(chunk, final=finished)
+        except UnicodeDecodeError:
+            raise BulkImportAborted(400, "Request body is not valid UTF-8", index)
+        buffer, pos = buffer[pos:] + text, 0
+        return True
+
+    async def peek() -> Optional[str]:
+        # Next non-whitespace character, without consuming it
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not await read_more():
+                return None
+
+    if await peek() != "[":
+        raise HTTPException(status_code=400, detail="Expected a JSON array of workout plans")
+    pos += 1
+    if await peek() == "]":
+        pos += 1
+    else:
+        while True:
+            if await peek() is None:
+                raise BulkImportAborted(400, "Request body ends inside the JSON array", index)
+            while True:
+                try:
+                    item, end = _json_decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    item, end = None, None
+                # A value reaching the end of the buffer may continue in the next chunk
+                if end is not None and (finished or buffer[end:].strip()):
+                    break
+                if not await read_more() and end is None:
+                    raise BulkImportAborted(400, f"Invalid JSON in workout plan {index}", index)
+            pos = end
+            yield index, item
+            index += 1
+
+            separator = await peek()
+            pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise BulkImportAborted(400, f"Expected ',' or ']' after workout plan {index - 1}", index)
+
+    if await peek() is not None:
+        raise BulkImportAborted(400, "Unexpected data after the JSON array", index)
+
+
+async def _iter_bulk_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (index, item) pairs from a JSON array or NDJSON request body
+
+    Both are parsed incrementally as the body streams in. NDJSON items that
+    are not valid JSON are yielded as the ValueError raised while parsing
+    them; a malformed JSON array stops with BulkImportAborted.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    if content_type not in NDJSON_CONTENT_TYPES:
+        async for index, item in _iter_json_array(request):
+            yield index, item
+        return
+
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                yield index, json.loads(line)
+            except ValueError as e:
+                yield index, e
+            index += 1
+    if buffer.strip():
+        try:
+            yield index, json.loads(buffer)
+        except ValueError as e:
+            yield index, e
+
+
+@router.post("/bulk", response_model=BulkCreateResponse, status_code=201)
+async def bulk_create_workout_plans(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create many workout plans for the current user in one request
+    
+    Accepts a JSON array of plans, or NDJSON (one plan per line) with
+    Content-Type application/x-ndjson; both are read incrementally. Plans
+    are validated as they are read and inserted in chunks of
+    BULK_INSERT_CHUNK_SIZE, one transaction per chunk. Invalid items are
+    skipped and reported by position.
+
+    Committed chunks stay committed if the import stops part way, because
+    the array is malformed (400) or a plan cannot be saved (500). The
+    error response then carries ``failed_index``, the position of the
+    first plan not created, along with the ids created before it.
+    
+    Returns:
+        Ids of the created plans (in input order) and per-item errors
+    """
+    created_ids: List[int] = []
+    errors: List[Dict[str, Any]] = []
+    chunk: List[Dict[str, Any]] = []
+    chunk_indexes: List[int] = []
+
+    def flush() -> None:
+        if not chunk:
+            return
+        try:
+            result = db.execute(
+                insert(WorkoutPlan).returning(WorkoutPlan.id, sort_by_parameter_order=True),
+                chunk
+            )
+            created_ids.extend(result.scalars().all())
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            # Save the chunk row by row to find the plan that failed
+            for index, row in zip(chunk_indexes, chunk):
+                try:
+                    created_ids.append(db.execute(insert(WorkoutPlan).returning(WorkoutPlan.id), row).scalar_one())
+                    db.commit()
+                except SQLAlchemyError:
+                    db.rollback()
+                    raise BulkImportAborted(500, f"Could not save workout plan {index}", index)
+        finally:
+            chunk.clear()
+            chunk_indexes.clear()
+
+    try:
+        try:
+            async for index, item in _iter_bulk_items(request):
+                if isinstance(item, ValueError):
+                    errors.append({"index": index, "detail": f"Invalid JSON: {item}"})
+                    continue
+                if not isinstance(item, dict):
+                    errors.append({"index": index, "detail": "Workout plan must be an object"})
+                    continue
+                try:
+                    plan = WorkoutPlanCreate(**item)
+                except ValidationError as e:
+                    errors.append({"index": index, "detail": e.errors()})
+                    continue
+
+                day_count, exercise_count = compute_plan_stats(plan.data)
+                chunk.append({
+                    "user_id": current_user.id,
+                    "data": plan.data,
+                    "plan_name": plan.plan_name,
+                    "plan_type": plan.plan_type or "training",
+                    "day_count": day_count,
+                    "exercise_count": exercise_count,
+                })
+                chunk_indexes.append(index)
+                if len(chunk) >= settings.BULK_INSERT_CHUNK_SIZE:
+                    flush()
+        except BulkImportAborted:
+            # Plans read before the malformed part of the body are still created
+            flush()
+            raise
+        flush()
+    except BulkImportAborted as e:
+        return JSONResponse(status_code=e.status_code, content=jsonable_encoder({
+            "detail": e.detail,
+            "failed_index": e.index,
+            "created": len(created_ids),
+            "created_ids": created_ids,
+            "errors": errors,
+        }))
+
+    return {"created_ids": created_ids, "errors": errors}
+
+
 @router.get("/", response_model=List[WorkoutPlanResponse])
 async def get_user_workout_plans(
     plan_type: Optional[str] = None,
@@ -83,14 +368,39 @@ async def get_user_workout_plans(
     if plan_type:
         query = query.filter(WorkoutPlan.plan_type == plan_type)
     
-    workout_plans = query.order_by(WorkoutPlan.created_at.desc()).all()
+    workout_plans = query.options(undefer(WorkoutPlan.data)).order_by(WorkoutPlan.created_at.desc()).all()
     
     return workout_plans
 
 
+@router.get("/summaries", response_model=List[WorkoutPlanSummaryResponse])
+async def get_user_workout_plan_summaries(
+    plan_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get lightweight summaries of the current user's workout plans
+    
+    Plan data is never loaded; day and exercise counts are precomputed.
+    
+    Returns:
+        List of workout plan summaries
+    """
+    query = db.query(WorkoutPlan).options(defer(WorkoutPlan.data, raiseload=True)).filter(
+        WorkoutPlan.user_id == current_user.id
+    )
+    
+    if plan_type:
+        query = query.filter(WorkoutPlan.plan_type == plan_type)
+    
+    return query.order_by(WorkoutPlan.created_at.desc()).all()
+
+
 @router.get("/{workout_id}", response_model=WorkoutPlanResponse)
 async def get_workout_plan(
     workout_id: int,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -108,6 +418,7 @@ async def get_workout_plan(
     if not workout_plan:
         raise HTTPException(status_code=404, detail="Workout plan not found")
     
+    response.headers["ETag"] = _etag(workout_plan)
     return workout_plan
 
 
@@ -134,6 +445,7 @@ async def update_workout_plan(
     
     # Update fields
     if workout_data.data is not None:
+        record_revision(db, workout_plan, workout_data.data)
         workout_plan.data = workout_data.data
     if workout_data.plan_name is not None:
         workout_plan.plan_name = workout_data.plan_name
@@ -146,6 +458,112 @@ async def update_workout_plan(
     return workout_plan
 
 
+@router.patch("/{workout_id}", response_model=WorkoutPlanResponse)
+async def patch_workout_plan(
+    workout_id: int,
+    response: Response,
+    patch: Union[List[Dict[str, Any]], Dict[str, Any]] = Body(...),
+    if_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Partially update a workout plan's data
+
+    Accepts either an RFC 6902 JSON Patch (array of operations) or an
+    RFC 7396 JSON Merge Patch (object). Send the plan's ETag in If-Match
+    to guard against concurrent edits.
+
+    Returns:
+        Updated workout plan
+    """
+    workout_plan = db.query(WorkoutPlan).filter(
+        WorkoutPlan.id == workout_id,
+        WorkoutPlan.user_id == current_user.id
+    ).first()
+    
+    if not workout_plan:
+        raise HTTPException(status_code=404, detail="Workout plan not found")
+    
+    _check_if_match(workout_plan, if_match)
+    
+    try:
+        if isinstance(patch, list):
+            patched = apply_json_patch(workout_plan.data, patch)
+        else:
+            patched = apply_merge_patch(workout_plan.data, patch)
+    except JsonPatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    if not isinstance(patched, dict):
+        raise HTTPException(status_code=422, detail="Patched plan data must be an object")
+    
+    if patched != workout_plan.data:
+        record_revision(db, workout_plan, patched)
+        workout_plan.data = patched
+        try:
+            db.commit()
+        except StaleDataError:
+            db.rollback()
+            raise HTTPException(status_code=409, detail="Workout plan was modified concurrently")
+        db.refresh(workout_plan)
+    
+    response.headers["ETag"] = _etag(workout_plan)
+    return workout_plan
+
+
+@router.get("/{workout_id}/revisions", response_model=List[WorkoutPlanRevisionResponse])
+async def get_workout_plan_revisions(
+    workout_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    List the stored revisions of a workout plan, newest first
+    
+    Returns:
+        Revision metadata (the current version is the plan itself)
+    """
+    workout_plan = db.query(WorkoutPlan).filter(
+        WorkoutPlan.id == workout_id,
+        WorkoutPlan.user_id == current_user.id
+    ).first()
+    
+    if not workout_plan:
+        raise HTTPException(status_code=404, detail="Workout plan not found")
+    
+    return list_revisions(db, workout_plan)
+
+
+@router.get("/{workout_id}/revisions/{version}", response_model=WorkoutPlanVersionResponse)
+async def get_workout_plan_revision(
+    workout_id: int,
+    version: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Reconstruct a workout plan's data as it was at a given version
+    
+    Returns:
+        Plan data for the requested version
+    """
+    workout_plan = db.query(WorkoutPlan).filter(
+        WorkoutPlan.id == workout_id,
+        WorkoutPlan.user_id == current_user.id
+    ).first()
+    
+    if not workout_plan:
+        raise HTTPException(status_code=404, detail="Workout plan not found")
+    
+    try:
+        data = materialize_revision(db, workout_plan, version)
+    except LookupError:
+        raise HTTPException(status_code=404, detail="Workout plan version not found")
+    
+    return {"workout_plan_id": workout_plan.id, "version": version, "data": data}
+
+
 @router.delete("/{workout_id}", status_code=204)
 async def delete_workout_plan(
     workout_id: int,
@@ -192,8 +610,32 @@ async def get_user_workout_plans_by_user_id(
     if plan_type:
         query = query.filter(WorkoutPlan.plan_type == plan_type)
     
-    workout_plans = query.order_by(WorkoutPlan.created_at.desc()).all()
+    workout_plans = query.options(undefer(WorkoutPlan.data)).order_by(WorkoutPlan.created_at.desc()).all()
     
     return workout_plans
 
 
+@router.get("/user/{user_id}/summaries", response_model=List[WorkoutPlanSummaryResponse])
+async def get_user_workout_plan_summaries_by_user_id(
+    user_id: int,
+    plan_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get lightweight workout plan summaries for a specific user (coach only)
+    
+    Returns:
+        List of workout plan summaries for the specified user
+    """
+    if current_user.role != "coach":
+        raise HTTPException(status_code=403, detail="Only coaches can access other users' plans")
+    
+    query = db.query(WorkoutPlan).options(defer(WorkoutPlan.data, raiseload=True)).filter(
+        WorkoutPlan.user_id == user_id
+    )
+    
+    if plan_type:
+        query = query.filter(WorkoutPlan.plan_type == plan_type)
+    
+    return query.order_by(WorkoutPlan.created_at.desc()).all()
@@ -3,17 +3,106 @@ Local Authentication Utilities
 Handles password hashing and JWT token generation for local auth
 """
 
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from jose import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified token claims, keyed on the token signature
+claims_cache = TTLCache(maxsize=settings.AUTH_CLAIMS_CACHE_SIZE, ttl=settings.AUTH_CLAIMS_CACHE_TTL)
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashPool:
+    """
+    Bounded thread pool for bcrypt work
+
+    bcrypt is deliberately slow, so hashing runs on dedicated threads instead
+    of the event loop. Requests beyond ``max_workers + max_queue`` are
+    rejected with 503 rather than queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.completed = 0
+        self.rejected = 0
+        self._pending = 0  # Submitted and not yet finished
+        self._running = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a free thread"""
+        return self._pending - self._running
+
+    @property
+    def in_flight(self) -> int:
+        """Number of tasks currently hashing"""
+        return self._running
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run ``func(*args)`` on the pool"""
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Authentication service is busy, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        def task() -> Any:
+            with self._lock:
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -25,6 +114,49 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+def calibrate_bcrypt_rounds(target_ms: Optional[int] = None) -> int:
+    """
+    Pick the bcrypt cost factor that hashes closest to a target latency
+
+    Hashes once at the minimum cost and extrapolates, since each extra
+    round doubles the work. New hashes use the chosen cost; existing
+    hashes keep verifying with the cost embedded in them.
+
+    Args:
+        target_ms: Target hashing time in milliseconds (defaults to BCRYPT_TARGET_MS)
+
+    Returns:
+        Chosen number of rounds
+    """
+    target_ms = target_ms or settings.BCRYPT_TARGET_MS
+    min_rounds = settings.BCRYPT_MIN_ROUNDS
+
+    probe = CryptContext(schemes=["bcrypt"], bcrypt__rounds=min_rounds)
+    start = time.perf_counter()
+    probe.hash("calibration-probe")
+    elapsed_ms = max((time.perf_counter() - start) * 1000, 0.001)
+
+    extra_rounds = math.floor(math.log2(target_ms / elapsed_ms)) if target_ms > elapsed_ms else 0
+    rounds = max(min_rounds, min(settings.BCRYPT_MAX_ROUNDS, min_rounds + extra_rounds))
+
+    pwd_context.update(bcrypt__rounds=rounds)
+    logger.info(
+        f"bcrypt calibrated to {rounds} rounds "
+        f"({elapsed_ms:.1f}ms at {min_rounds} rounds, target {target_ms}ms)"
+    )
+    return rounds
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token
@@ -67,16 +199,35 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    signing_input, _, signature = token.rpartition(".")
+
+    if settings.AUTH_CACHE_ENABLED:
+        cached = claims_cache.get(signature)
+        # The signature only identifies the token together with what it signs
+        if cached is not None and cached[0] == signing_input:
+            payload = cached[1]
+            if payload.get("exp", float("inf")) <= time.time():
+                claims_cache.delete(signature)
+                raise HTTPException(status_code=401, detail="Token expired")
+            return dict(payload)
+
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    if settings.AUTH_CACHE_ENABLED:
+        ttl = settings.AUTH_CLAIMS_CACHE_TTL
+        if "exp" in payload:
+            ttl = min(ttl, payload["exp"] - time.time())
+        claims_cache.set(signature, (signing_input, dict(payload)), ttl=ttl)
+
+    return payload
+
 
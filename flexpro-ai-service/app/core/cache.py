@@ -0,0 +1,418 @@
+"""
+Caching utilities
+Bounded in-process TTL caches and a two-tier (local + Redis) result cache
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import anyio
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live
+
+    Args:
+        maxsize: Maximum number of entries before the least recently used is evicted
+        ttl: Default time-to-live in seconds
+        on_remove: Called with the key of every entry that is evicted, expires
+            or is deleted, outside the cache's lock
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 60.0,
+        on_remove: Optional[Callable[[Hashable], None]] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_remove = on_remove
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, or ``default`` if it is missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            expired = expires_at <= time.monotonic()
+            if expired:
+                del self._data[key]
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+        if expired:
+            self._removed([key])
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        evicted = []
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+        self._removed(evicted)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove a value if present"""
+        with self._lock:
+            removed = self._data.pop(key, _MISSING) is not _MISSING
+        if removed:
+            self._removed([key])
+
+    def clear(self) -> None:
+        """Remove all values"""
+        with self._lock:
+            keys = list(self._data)
+            self._data.clear()
+        self._removed(keys)
+
+    def _removed(self, keys: List[Hashable]) -> None:
+        if self.on_remove is not None:
+            for key in keys:
+                self.on_remove(key)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """
+    Two-tier result cache with tag-based invalidation
+
+    A process-local TTLCache sits in front of an optional Redis tier shared
+    by all workers. Concurrent misses for the same key within a process
+    share one loader call (single-flight). Entries are tagged, and
+    invalidating a tag drops its entries from both tiers and, through Redis
+    pub/sub, from the local tier of every other worker. Other per-process
+    state derived from a table can ``subscribe`` to its tag to hear about
+    writes made by other workers.
+    """
+
+    CHANNEL = "cache:invalidate"
+
+    def __init__(self, local: TTLCache, redis_client: Any = None, prefix: str = "cache:"):
+        self.local = local
+        self.redis = redis_client
+        self.prefix = prefix
+        self.remote_hits = 0
+        self.remote_misses = 0
+        # Tag -> keys in the local tier, and the reverse, kept in step with
+        # the local tier's evictions so neither outgrows it
+        self._tag_keys: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Set[str]] = {}
+        local.on_remove = self._forget_local
+        self._epoch = 0  # Bumped on every invalidation
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        self._listener: Optional["asyncio.Task"] = None
+        # Identifies this worker's messages on the invalidation channel
+        self._origin = uuid.uuid4().hex
+        self._subscribers: Dict[str, List[Callable[[], None]]] = {}
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = ()
+    ) -> Any:
+        """
+        Return the cached value for ``key``, computing it with ``loader`` on a miss
+
+        The loader may be sync or async; its result is stored JSON-encoded.
+        """
+        with span("cache", **{"cache.key": key}):
+            return await self._get_or_set(key, loader, ttl, tags)
+
+    async def _get_or_set(self, key: str, loader: Callable[[], Any], ttl: Optional[float], tags: Iterable[str]) -> Any:
+        if not settings.CACHE_ENABLED:
+            return jsonable_encoder(await _maybe_await(loader()))
+
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        epoch = self._epoch
+        try:
+            value = await self._get_remote(key)
+            if value is _MISSING:
+                value = jsonable_encoder(await _maybe_await(loader()))
+                # Don't store a result that an invalidation raced with
+                if epoch == self._epoch:
+                    await self._set_remote(key, value, ttl or settings.CACHE_DEFAULT_TTL, tags)
+            if epoch == self._epoch:
+                self._set_local(key, value, tags)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def invalidate_local(self, tags: Iterable[str]) -> None:
+        """Drop entries carrying any of ``tags`` from this process"""
+        self._epoch += 1
+        for tag in tags:
+            for key in self._tag_keys.pop(tag, ()):
+                self.local.delete(key)
+
+    def invalidate_tags_from_thread(self, tags: Iterable[str]) -> None:
+        """
+        ``invalidate_tags`` for code running outside the event loop
+
+        Worker threads of a running loop (sync routes) hand the call to the
+        loop; anything else (scripts) publishes with a blocking client.
+        """
+        tags = list(tags)
+        try:
+            anyio.from_thread.run(self.invalidate_tags, tags)
+            return
+        except RuntimeError:
+            pass  # Not in a worker thread of a running loop
+
+        self.invalidate_local(tags)
+        try:
+            import redis
+
+            client = redis.from_url(settings.REDIS_URL)
+            try:
+                for tag in tags:
+                    tag_key = f"{self.prefix}tag:{tag}"
+                    client.delete(tag_key, *client.smembers(tag_key))
+                client.publish(self.CHANNEL, json.dumps({"origin": self._origin, "tags": tags}))
+            finally:
+                client.close()
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> None:
+        """Drop entries carrying any of ``tags`` from every tier and worker"""
+        tags = list(tags)
+        self.invalidate_local(tags)
+        if self.redis is None or not tags:
+            return
+        try:
+            for tag in tags:
+                tag_key = f"{self.prefix}tag:{tag}"
+                keys = await self.redis.smembers(tag_key)
+                await self.redis.delete(tag_key, *keys)
+            await self.redis.publish(self.CHANNEL, json.dumps({"origin": self._origin, "tags": tags}))
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+
+    def subscribe(self, tag: str, callback: Callable[[], None]) -> None:
+        """Call ``callback`` whenever another worker invalidates ``tag``"""
+        self._subscribers.setdefault(tag, []).append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local_entries": len(self.local),
+            "local_hits": self.local.hits,
+            "local_misses": self.local.misses,
+            "local_hit_ratio": self.local.hit_ratio,
+            "remote_hits": self.remote_hits,
+            "remote_misses": self.remote_misses,
+        }
+
+    async def start(self) -> None:
+        """Listen for invalidations published by other workers"""
+        if self.redis is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._on_message(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                await asyncio.sleep(1)
+
+    def _on_message(self, payload: Dict[str, Any]) -> None:
+        tags = payload["tags"]
+        self.invalidate_local(tags)
+        if payload.get("origin") == self._origin:
+            return
+        for tag in tags:
+            for callback in self._subscribers.get(tag, ()):
+                try:
+                    callback()
+                except Exception as e:
+                    logger.warning(f"Cache invalidation subscriber for {tag} failed: {e}")
+
+    def _set_local(self, key: str, value: Any, tags: Iterable[str]) -> None:
+        if self.local.ttl <= 0:
+            return
+        # Tags first, so an immediate eviction is forgotten too
+        for tag in tags:
+            self._tag_keys.setdefault(tag, set()).add(key)
+            self._key_tags.setdefault(key, set()).add(tag)
+        self.local.set(key, value)
+
+    def _forget_local(self, key: Hashable) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    async def _get_remote(self, key: str) -> Any:
+        if self.redis is None:
+            return _MISSING
+        try:
+            raw = await self.redis.get(self.prefix + key)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {e}")
+            return _MISSING
+        if raw is None:
+            self.remote_misses += 1
+            return _MISSING
+        self.remote_hits += 1
+        return json.loads(raw)
+
+    async def _set_remote(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        if self.redis is None:
+            return
+        try:
+            ex = max(1, int(ttl))
+            pipe = self.redis.pipeline()
+            pipe.set(self.prefix + key, json.dumps(value), ex=ex)
+            for tag in tags:
+                tag_key = f"{self.prefix}tag:{tag}"
+                pipe.sadd(tag_key, self.prefix + key)
+                # The set outlives its longest-lived entry, then expires
+                pipe.expire(tag_key, ex, nx=True)
+                pipe.expire(tag_key, ex, gt=True)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+
+
+_MISSING = object()
+
+
+async def _maybe_await(value: Any) -> Any:
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def cache_key(namespace: str, **params: Any) -> str:
+    """Build a deterministic cache key from a namespace and parameters"""
+    parts = [f"{name}={params[name]}" for name in sorted(params) if params[name] is not None]
+    return namespace + "?" + "&".join(parts)
+
+
+def row_to_dict(obj: Any) -> Dict[str, Any]:
+    """Column values of an ORM object as a plain dict"""
+    return {attr.key: getattr(obj, attr.key) for attr in sa_inspect(obj).mapper.column_attrs}
+
+
+def _create_result_cache() -> ResultCache:
+    redis_client = None
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+
+            redis_client = redis.from_url(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis is not installed, using the local cache tier only")
+    return ResultCache(
+        TTLCache(maxsize=settings.CACHE_LOCAL_MAXSIZE, ttl=settings.CACHE_LOCAL_TTL),
+        redis_client
+    )
+
+
+result_cache = _create_result_cache()
+
+
+# Tag invalidation on ORM writes
+def _tags_for(obj: Any) -> Set[str]:
+    table = getattr(obj, "__tablename__", None)
+    if table == "users":
+        return {f"user:{obj.id}"}
+    if table == "workout_plans":
+        return {f"plans:{obj.user_id}"}
+    return {table} if table else set()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cache_tags(session: Session, flush_context) -> None:
+    tags = session.info.setdefault("cache_tags", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tags |= _tags_for(obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache_tags(session: Session) -> None:
+    tags = session.info.pop("cache_tags", None)
+    if not tags:
+        return
+    result_cache.invalidate_local(tags)
+    if result_cache.redis is not None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Committed off the event loop (sync routes, scripts)
+            result_cache.invalidate_tags_from_thread(tags)
+        else:
+            loop.create_task(result_cache.invalidate_tags(tags))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_tags(session: Session) -> None:
+    session.info.pop("cache_tags", None)
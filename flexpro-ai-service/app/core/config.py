@@ -13,6 +13,7 @@ class Settings(BaseSettings):
 
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
+    LAZY_IMPORTS: bool = os.getenv("LAZY_IMPORTS", "true").lower() == "true"  # Defer heavy optional modules
 
     # Local Mode Configuration
     LOCAL_MODE: bool = True  # Always run in local mode
@@ -26,8 +27,35 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
 
+    # Authentication Caches
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000
+    AUTH_CLAIMS_CACHE_TTL: int = 300  # seconds (never beyond token expiry)
+    AUTH_USER_CACHE_SIZE: int = 5000
+    AUTH_USER_CACHE_TTL: int = 60  # seconds
+
+    # Password Hashing
+    PASSWORD_HASH_WORKERS: int = 2  # Dedicated bcrypt threads
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # Waiting requests before rejecting with 503
+    BCRYPT_AUTO_CALIBRATE: bool = True
+    BCRYPT_TARGET_MS: int = 250  # Target hashing latency for calibration
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 14
+
     # Local SQLite Database (automatically configured)
     DATABASE_URL: Optional[str] = None  # Auto-configured in database.py
+    DATABASE_TEMPLATE_PATH: Optional[str] = os.getenv("DATABASE_TEMPLATE_PATH")  # Prebuilt seeded database
+    DATABASE_TEMPLATE_SHA256: Optional[str] = None  # Defaults to <template>.sha256
+    STARTUP_LOCK_TIMEOUT: int = 300  # seconds to wait for another worker's migration
+
+    # Readiness Checks
+    HEALTH_CHECK_BUDGET_MS: float = 250
+    HEALTH_DB_BUDGET_MS: float = 250
+    HEALTH_CACHE_BUDGET_MS: float = 100
+    HEALTH_WAL_MAX_BYTES: int = 64 * 1024 * 1024
+    HEALTH_WAL_MAX_LAG_FRAMES: int = 10000
+    HEALTH_POOL_MAX_SATURATION: float = 0.9
+    HEALTH_REPORT_TTL_SECONDS: float = 1.0  # Probes within this window share one report
 
     # Training System Configuration
     MAX_WORKOUT_EXERCISES: int = 12
@@ -46,19 +74,89 @@ class Settings(BaseSettings):
     # Cardio Parameters
     MIN_CARDIO_MINUTES: int = 5
     MAX_CARDIO_MINUTES: int = 120
+
+    # Workout Plan History
+    WORKOUT_REVISION_SNAPSHOT_INTERVAL: int = 10  # Full snapshot every N revisions
+
+    # Bulk Import
+    BULK_INSERT_CHUNK_SIZE: int = 500  # Rows per transaction
+
+    # Plan Document Compression
+    PLAN_COMPRESSION: str = os.getenv("PLAN_COMPRESSION", "zlib")  # 'zlib', 'zstd' or 'none'
+    PLAN_COMPRESSION_LEVEL: int = 6
+    PLAN_COMPRESSION_MIN_BYTES: int = 256  # Smaller documents are stored uncompressed
+
+    # Response Compression
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = 1024  # Smaller bodies are sent uncompressed
+    COMPRESSION_ENCODINGS: list = ["zstd", "br", "gzip"]  # Server preference; missing codecs are skipped
+    # GET route prefixes whose bodies get an ETag and cached compressed variants
+    COMPRESSION_CACHED_ROUTES: list = ["/api/v1/exercises", "/api/v1/foods", "/api/v1/supplements"]
+    COMPRESSION_CACHE_SIZE: int = 256  # Cached compressed bodies
     
     # API Configuration
     ENABLE_CORS: bool = True
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:5173", "http://localhost:8080"]
 
     # Rate Limiting (disabled for local use)
-    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
     RATE_LIMIT_REQUESTS: int = 1000
     RATE_LIMIT_WINDOW: int = 60  # seconds
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # 'memory' or 'redis'
+    RATE_LIMIT_SHARDS: int = 16
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Use X-Forwarded-For behind a proxy
+    # Stricter limits (requests per window) for expensive route prefixes
+    RATE_LIMIT_ROUTES: dict = {
+        "/api/v1/auth/login": 10,
+        "/api/v1/auth/register": 5,
+        "/api/v1/generate": 30,
+    }
+
+    # Redis (optional, used by the redis backends)
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    # Result Cache
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "memory")  # 'memory' or 'redis'
+    CACHE_LOCAL_MAXSIZE: int = 2048
+    CACHE_LOCAL_TTL: int = 30  # seconds (bounds staleness if an invalidation is missed)
+    CACHE_DEFAULT_TTL: int = 300  # seconds in the Redis tier
 
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
-    LOG_TO_FILE: bool = False
+    LOG_TO_FILE: bool = os.getenv("LOG_TO_FILE", "false").lower() == "true"  # Write to logs/app.log if LOG_FILE is unset
+    LOG_FILE: Optional[str] = os.getenv("LOG_FILE", "logs/app.log" if ENVIRONMENT == "production" else "") or None
+    LOG_QUEUE_SIZE: int = 10000  # Records beyond this are dropped rather than blocking
+    LOG_BATCH_SIZE: int = 256
+    LOG_FLUSH_INTERVAL: float = 0.5  # seconds
+    LOG_MAX_BYTES: int = 50 * 1024 * 1024
+    LOG_ROTATE_SECONDS: int = 24 * 3600
+    LOG_BACKUP_COUNT: int = 7
+    LOG_INFO_SAMPLE_RATE: float = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))  # Fraction of INFO records kept
+
+    # Metrics
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Request Tracing
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACE_EXPORT: Optional[str] = os.getenv("TRACE_EXPORT")  # File path or OTLP/HTTP URL (.../v1/traces)
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))  # Fraction of traces exported
+
+    # SQL Diagnostics
+    QUERY_LOG_ENABLED: bool = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "100"))
+    SLOW_QUERY_EXPLAIN: bool = True  # Attach EXPLAIN QUERY PLAN to slow SELECTs
+    QUERY_BUDGET_PER_REQUEST: int = 20
+    QUERY_REPEAT_THRESHOLD: int = 5  # Same statement shape this often in one request suggests N+1
+    # Budgets for route templates (prefix match) that legitimately need more
+    QUERY_BUDGET_ROUTES: dict = {
+        "/api/v1/workouts/bulk": 500,
+    }
+
+    # Sampling Profiler
+    PROFILER_MAX_SECONDS: int = 60
+    PROFILER_INTERVAL_MS: float = 5.0
+    PROFILER_REQUEST_TOKEN: Optional[str] = os.getenv("PROFILER_REQUEST_TOKEN")  # Enables X-Profile per-request mode
 
     # Optional AI Configuration (for future features)
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
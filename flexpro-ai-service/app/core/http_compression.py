@@ -0,0 +1,310 @@
+"""
+Response compression
+Content-Encoding negotiation (zstd, brotli, gzip) with cached precompressed catalog bodies
+"""
+
+import asyncio
+import hashlib
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+# Both optional; gzip is always available
+brotli = lazy_import("brotli")
+zstandard = lazy_import("zstandard")
+
+# (per-response level, level for cached bodies that are requested repeatedly)
+LEVELS: Dict[str, Tuple[int, int]] = {
+    "gzip": (6, 9),
+    "br": (4, 11),
+    "zstd": (3, 19),
+}
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+# Status codes whose responses have no body
+_NO_BODY_STATUSES = {204, 304}
+
+
+def available_encodings() -> List[str]:
+    """Configured encodings whose codec is installed, in server preference order"""
+    installed = {"gzip": True, "br": brotli is not None, "zstd": zstandard is not None}
+    return [encoding for encoding in settings.COMPRESSION_ENCODINGS if installed.get(encoding)]
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Map each coding in an Accept-Encoding header to its q-value"""
+    codings = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[name] = quality
+    return codings
+
+
+def negotiate_encoding(header: Optional[str], available: List[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response
+
+    The client's q-values decide; ties go to the server's preference order
+    (``available``). Returns None when the response should not be encoded.
+    """
+    if not header or not available:
+        return None
+    codings = parse_accept_encoding(header)
+    if "x-gzip" in codings and "gzip" not in codings:
+        codings["gzip"] = codings["x-gzip"]
+    wildcard = codings.get("*", 0.0)
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = codings.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    """Compress a complete body; ``cached`` bodies use the slower, stronger level"""
+    level = LEVELS[encoding][1 if cached else 0]
+    if encoding == "gzip":
+        encoder = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return encoder.compress(body) + encoder.flush()
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unknown content encoding: {encoding}")
+
+
+class StreamEncoder:
+    """Incremental compressor for streamed bodies; every chunk is flushed so clients see it promptly"""
+
+    def __init__(self, encoding: str):
+        level = LEVELS[encoding][0]
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._encoder = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._encoder = brotli.Compressor(quality=level)
+        elif encoding == "zstd":
+            self._encoder = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            raise ValueError(f"Unknown content encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._encoder.compress(data) + self._encoder.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._encoder.process(data) + self._encoder.flush()
+        return self._encoder.compress(data) + self._encoder.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._encoder.finish()
+        return self._encoder.flush()
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+def _etag_matches(if_none_match: str, digest: str) -> bool:
+    # Encoded variants carry a "-<coding>" suffix; any variant of the same body matches
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag == "*" or tag.split("-", 1)[0] == digest:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses the client accepts encoded
+
+    Bodies smaller than COMPRESSION_MIN_SIZE, non-text content types and
+    responses that are already encoded are sent as is. Successful GET
+    responses under COMPRESSION_CACHED_ROUTES (the catalogs) get a strong
+    ETag derived from the body, answer matching If-None-Match with 304,
+    and keep their compressed variants keyed by that ETag, so an
+    unchanged catalog page is compressed once rather than per request.
+    Most bodies are only seen once, so a variant starts at the
+    per-response level; when the same body is served again it is
+    recompressed at the slow, strong level in the threadpool, in the
+    background, and later requests get that.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # (digest, encoding) -> (strong level, encoded body)
+        self.variants = TTLCache(maxsize=settings.COMPRESSION_CACHE_SIZE, ttl=settings.CACHE_LOCAL_TTL)
+        self._upgrades: Dict[Tuple[str, str], "asyncio.Task"] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {name: value for name, value in scope["headers"] if name in (b"accept-encoding", b"if-none-match")}
+        accept_encoding = request_headers.get(b"accept-encoding", b"").decode("latin-1")
+        encoding = negotiate_encoding(accept_encoding, available_encodings())
+        cacheable = scope["method"] == "GET" and scope["path"].startswith(tuple(settings.COMPRESSION_CACHED_ROUTES))
+        if encoding is None and not cacheable:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1")
+        start_message = None
+        headers: List[Tuple[bytes, bytes]] = []
+        chunks: List[bytes] = []
+        buffered = 0
+        encoder: Optional[StreamEncoder] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, headers, buffered, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                headers = list(message.get("headers", []))
+                header_names = {name.lower() for name, _ in headers}
+                content_type = next((value for name, value in headers if name.lower() == b"content-type"), b"")
+                cache_control = next((value for name, value in headers if name.lower() == b"cache-control"), b"")
+                passthrough = (
+                    message["status"] in _NO_BODY_STATUSES
+                    or b"content-encoding" in header_names
+                    or not is_compressible(content_type.decode("latin-1"))
+                    or b"no-transform" in cache_control.lower()
+                )
+                if passthrough:
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is not None:
+                data = encoder.compress(body) if body else b""
+                if not more_body:
+                    data += encoder.finish()
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            chunks.append(body)
+            buffered += len(body)
+            if not more_body:
+                await self._send_complete(send, start_message, headers, b"".join(chunks), encoding,
+                                          cacheable, if_none_match)
+                return
+
+            # Streaming: hold chunks until there is enough to be worth compressing
+            if encoding is None or buffered < settings.COMPRESSION_MIN_SIZE:
+                return
+            encoder = StreamEncoder(encoding)
+            headers = _set_encoding_headers(headers, encoding, content_length=None)
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": encoder.compress(b"".join(chunks)), "more_body": True})
+            chunks.clear()
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_complete(self, send, start_message, headers, body, encoding, cacheable, if_none_match):
+        digest = None
+        if cacheable and start_message["status"] == 200:
+            existing = next((value for name, value in headers if name.lower() == b"etag"), None)
+            if existing is None:
+                digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+                if if_none_match and _etag_matches(if_none_match, digest):
+                    not_modified = [(name, value) for name, value in headers
+                                    if name.lower() not in (b"content-length", b"content-type")]
+                    not_modified.append((b"etag", f'"{digest}"'.encode("latin-1")))
+                    await send({**start_message, "status": 304, "headers": _add_vary(not_modified)})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+        if encoding is None or len(body) < settings.COMPRESSION_MIN_SIZE:
+            if digest is not None:
+                headers = headers + [(b"etag", f'"{digest}"'.encode("latin-1"))]
+            await send({**start_message, "headers": _add_vary(headers)})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        if digest is not None:
+            key = (digest, encoding)
+            variant = self.variants.get(key)
+            if variant is None:
+                encoded = compress(body, encoding)
+                self.variants.set(key, (False, encoded))
+            else:
+                strong, encoded = variant
+                if not strong:
+                    self._upgrade(key, body)
+            headers = headers + [(b"etag", f'"{digest}-{encoding}"'.encode("latin-1"))]
+        else:
+            encoded = compress(body, encoding)
+
+        headers = _set_encoding_headers(headers, encoding, content_length=len(encoded))
+        await send({**start_message, "headers": headers})
+        await send({"type": "http.response.body", "body": encoded})
+
+
+    def _upgrade(self, key: Tuple[str, str], body: bytes) -> None:
+        """Recompress a repeatedly served variant at the strong level, once"""
+        if key in self._upgrades:
+            return
+
+        async def upgrade():
+            try:
+                encoded = await run_in_threadpool(compress, body, key[1], cached=True)
+                self.variants.set(key, (True, encoded))
+            finally:
+                del self._upgrades[key]
+
+        self._upgrades[key] = asyncio.get_running_loop().create_task(upgrade())
+
+
+def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+def _set_encoding_headers(headers, encoding: str, content_length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+    headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+    headers.append((b"content-encoding", encoding.encode("latin-1")))
+    if content_length is not None:
+        headers.append((b"content-length", str(content_length).encode("latin-1")))
+    return _add_vary(headers)
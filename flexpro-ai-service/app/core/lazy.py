@@ -0,0 +1,42 @@
+"""
+Lazy imports
+Defer loading heavy optional modules until they are first used
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Optional
+
+from app.core.config import settings
+
+
+def lazy_import(name: str) -> Optional[ModuleType]:
+    """
+    Import a module, deferring its execution to first attribute access
+
+    With LAZY_IMPORTS disabled the module is imported immediately. Either
+    way, a module that is not installed returns None, so optional
+    dependencies can keep using ``if module is None`` checks.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if not settings.LAZY_IMPORTS:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            return None
+
+    try:
+        spec = importlib.util.find_spec(name)
+    except ImportError:  # Parent package missing
+        return None
+    if spec is None or spec.loader is None:
+        return None
+
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,224 @@
+"""
+Logging pipeline
+Non-blocking log handler feeding a background writer that batches, rotates and samples
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler
+from pathlib import Path
+from typing import IO, List, Optional
+
+from app.core.config import settings
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of INFO and lower records
+
+    Warnings and errors always pass. A record can opt out of sampling with
+    ``extra={"sample": False}``.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1 or record.levelno >= logging.WARNING or not getattr(record, "sample", True):
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RotatingLogFile:
+    """
+    Append-only log file rotated by size and age
+
+    Rotated files get a timestamp suffix; the oldest are removed beyond
+    ``backup_count``.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, rotate_seconds: float, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[IO[str]] = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self.path.stat().st_size
+        self._opened_at = time.time()
+
+    def write(self, text: str) -> None:
+        # Size limits are in bytes on disk, not characters
+        size = len(text.encode("utf-8"))
+        if self._should_rotate(size):
+            self.rotate()
+        self._file.write(text)
+        self._size += size
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _should_rotate(self, incoming: int) -> bool:
+        if self._size == 0:
+            return False
+        if self.max_bytes and self._size + incoming > self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def rotate(self) -> None:
+        self.close()
+        # Sortable suffix, so name order is age order
+        suffix = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.{suffix}"))
+
+        backups = sorted(self.path.parent.glob(f"{self.path.name}.*"))
+        for old in backups[:max(0, len(backups) - self.backup_count)]:
+            old.unlink()
+        self._open()
+
+
+class StreamTarget:
+    """Adapter so a stream can be used where a RotatingLogFile is expected"""
+
+    def __init__(self, stream: IO[str]):
+        self.stream = stream
+
+    def write(self, text: str) -> None:
+        self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class BatchWriter(threading.Thread):
+    """
+    Background thread draining the log queue
+
+    Records are written in batches of up to ``batch_size`` and flushed at
+    least every ``flush_interval`` seconds, so a burst of logging costs one
+    write and flush instead of one per record.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_queue: queue.Queue, target, batch_size: int, flush_interval: float):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.target = target
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: List[str] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    record = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if record is self._STOP:
+                    stopping = True
+                    break
+                batch.append(record.getMessage() + "\n")
+
+            if batch:
+                try:
+                    self.target.write("".join(batch))
+                    self.target.flush()
+                except Exception as e:  # Never let logging kill the writer
+                    sys.stderr.write(f"Log write failed: {e}\n")
+        self.target.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self.queue.put(self._STOP)
+        self.join(timeout)
+
+
+_writer: Optional[BatchWriter] = None
+
+
+def configure_logging() -> NonBlockingQueueHandler:
+    """
+    Route stdlib (and therefore structlog) logging through the pipeline
+
+    Writes to LOG_FILE when set (logs/app.log with LOG_TO_FILE), otherwise
+    to stderr.
+    """
+    global _writer
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.addFilter(SamplingFilter(settings.LOG_INFO_SAMPLE_RATE))
+
+    log_file = settings.LOG_FILE or ("logs/app.log" if settings.LOG_TO_FILE else None)
+    if log_file:
+        target = RotatingLogFile(
+            Path(log_file),
+            max_bytes=settings.LOG_MAX_BYTES,
+            rotate_seconds=settings.LOG_ROTATE_SECONDS,
+            backup_count=settings.LOG_BACKUP_COUNT,
+        )
+    else:
+        target = StreamTarget(sys.stderr)
+
+    _writer = BatchWriter(log_queue, target, settings.LOG_BATCH_SIZE, settings.LOG_FLUSH_INTERVAL)
+    _writer.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Write out queued records and stop the writer"""
+    global _writer
+
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
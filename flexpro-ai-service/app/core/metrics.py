@@ -0,0 +1,354 @@
+"""
+Application metrics
+Request, database, cache and worker pool metrics in Prometheus text format
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.routing import Match
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}" for labels, value in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    """Cumulative bucketed observations per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum, count)
+        self._values: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, *labels: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._values.items()]
+
+        lines = []
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector) -> None:
+        """Register a callable returning (name, kind, documentation, [(labels dict, value)]) tuples"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "SQL statements executed by route template", ("route",)
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("route",), buckets=DB_BUCKETS
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ("route",), buckets=QUERY_COUNT_BUCKETS
+))
+
+
+class RequestStats:
+    """Route and database work attributed to the current request"""
+
+    __slots__ = ("route", "queries", "query_seconds", "query_shapes")
+
+    def __init__(self):
+        self.route = "unmatched"
+        self.queries = 0
+        self.query_seconds = 0.0
+        # Normalized statement -> executions, filled in by the query log
+        self.query_shapes: Dict[str, int] = {}
+
+
+# Holds a mutable object so threadpool copies of the context share it
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+@contextmanager
+def request_stats(router_app, scope) -> Iterator[RequestStats]:
+    """
+    The current request's stats
+
+    The outermost middleware to ask creates them and resolves the route;
+    the ones inside it share the same object.
+    """
+    stats = current_request_stats.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = RequestStats()
+    stats.route = route_template(router_app, scope)
+    token = current_request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_request_stats.reset(token)
+
+
+# (request stats, cursor, statement, parameters, executemany, elapsed seconds)
+StatementListener = Callable[[Optional[RequestStats], Any, str, Any, bool, float], None]
+
+_statement_listeners: Dict[Any, List[StatementListener]] = {}
+
+
+def add_statement_listener(engine, listener: StatementListener) -> None:
+    """
+    Call ``listener`` after every statement on ``engine``
+
+    All listeners share one pair of cursor events that times the statement
+    and attributes it to the current request.
+    """
+    listeners = _statement_listeners.get(engine)
+    if listeners is None:
+        listeners = _statement_listeners[engine] = []
+        _install_statement_timer(engine, listeners)
+    listeners.append(listener)
+
+
+def _install_statement_timer(engine, listeners: List[StatementListener]) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+        for listener in listeners:
+            listener(stats, cursor, statement, parameters, executemany, elapsed)
+
+
+def _observe_query(stats, cursor, statement, parameters, executemany, elapsed) -> None:
+    route = stats.route if stats is not None else "background"
+    db_queries_total.inc(route)
+    db_query_duration_seconds.observe(route, value=elapsed)
+
+
+def install_db_metrics(engine) -> None:
+    """Count and time every statement on ``engine`` by the route that ran it"""
+    add_statement_listener(engine, _observe_query)
+
+
+def route_template(app, scope) -> str:
+    """The path template of the route that handles ``scope``, e.g. /api/v1/workouts/{plan_id}"""
+    for route in getattr(app, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request counts, latency and in-flight requests
+
+    Requests are labelled by route template rather than raw path so
+    metrics cardinality stays bounded.
+    """
+
+    def __init__(self, app, router_app):
+        self.app = app
+        # The application whose routes are matched; routing happens after
+        # this middleware, so the route is resolved up front
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with request_stats(self.router_app, scope) as stats:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - started
+                http_requests_in_flight.dec()
+                labels = (scope["method"], stats.route, str(status_code))
+                http_requests_total.inc(*labels)
+                http_request_duration_seconds.observe(*labels, value=elapsed)
+                db_queries_per_request.observe(stats.route, value=stats.queries)
+
+
+def _cache_samples():
+    from app.core.auth import claims_cache
+    from app.core.cache import result_cache
+    from app.core.security import user_cache
+
+    caches = {
+        "result_local": result_cache.local,
+        "auth_claims": claims_cache,
+        "auth_user": user_cache,
+    }
+    hits = [({"cache": name}, cache.hits) for name, cache in caches.items()]
+    misses = [({"cache": name}, cache.misses) for name, cache in caches.items()]
+    ratios = [({"cache": name}, cache.hit_ratio) for name, cache in caches.items()]
+    entries = [({"cache": name}, len(cache)) for name, cache in caches.items()]
+
+    hits.append(({"cache": "result_remote"}, result_cache.remote_hits))
+    misses.append(({"cache": "result_remote"}, result_cache.remote_misses))
+    remote_total = result_cache.remote_hits + result_cache.remote_misses
+    ratios.append(({"cache": "result_remote"}, result_cache.remote_hits / remote_total if remote_total else 0.0))
+
+    return [
+        ("cache_hits_total", "counter", "Cache hits", hits),
+        ("cache_misses_total", "counter", "Cache misses", misses),
+        ("cache_hit_ratio", "gauge", "Cache hit ratio since start", ratios),
+        ("cache_entries", "gauge", "Entries held in process", entries),
+    ]
+
+
+def _password_pool_samples():
+    from app.core.auth import password_hash_pool
+
+    stats = password_hash_pool.stats()
+    return [
+        ("password_hash_queue_depth", "gauge", "Password hashes waiting for a bcrypt thread", [({}, stats["queue_depth"])]),
+        ("password_hash_in_flight", "gauge", "Password hashes running", [({}, stats["in_flight"])]),
+        ("password_hash_workers", "gauge", "bcrypt threads", [({}, stats["workers"])]),
+        ("password_hash_completed_total", "counter", "Password hashes completed", [({}, stats["completed"])]),
+        ("password_hash_rejected_total", "counter", "Password hashes rejected because the queue was full",
+         [({}, stats["rejected"])]),
+    ]
+
+
+registry.add_collector(_cache_samples)
+registry.add_collector(_password_pool_samples)
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format"""
+    return registry.render()
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,246 @@
+"""
+Sampling profiler
+Statistical stack sampling of a live worker's threads, with no external agent
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+Stack = Tuple[str, ...]
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Periodically record the stack of every thread
+
+    Sampling runs on its own thread using ``sys._current_frames``, so the
+    profiled code is not instrumented and the overhead is one frame walk
+    per thread per interval.
+
+    Args:
+        interval: Seconds between samples
+        max_depth: Deepest frames kept per stack
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.started_at = 0.0
+        self.stopped_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.perf_counter()
+        return self
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[tuple(reversed(stack))] += 1
+            self.sample_count += 1
+
+    @property
+    def duration(self) -> float:
+        return (self.stopped_at or time.perf_counter()) - self.started_at
+
+
+def to_collapsed(samples: Dict[Stack, int]) -> str:
+    """Brendan Gregg's collapsed stack format, one ``a;b;c count`` line per stack"""
+    lines = [";".join(frame.replace(";", ":") for frame in stack) + f" {count}" for stack, count in samples.items()]
+    return "\n".join(sorted(lines)) + "\n"
+
+
+def to_speedscope(samples: Dict[Stack, int], name: str, interval: float) -> Dict[str, Any]:
+    """A speedscope file with one sampled profile per thread"""
+    frames: List[Dict[str, str]] = []
+    frame_index: Dict[str, int] = {}
+    by_thread: Dict[str, List[Tuple[List[int], int]]] = {}
+
+    for stack, count in samples.items():
+        thread_name, *calls = stack
+        indexes = []
+        for call in calls:
+            if call not in frame_index:
+                frame_index[call] = len(frames)
+                frames.append({"name": call})
+            indexes.append(frame_index[call])
+        by_thread.setdefault(thread_name, []).append((indexes, count))
+
+    profiles = []
+    for thread_name, stacks in sorted(by_thread.items()):
+        total = sum(count for _, count in stacks)
+        profiles.append({
+            "type": "sampled",
+            "name": thread_name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": total * interval,
+            "samples": [indexes for indexes, _ in stacks],
+            "weights": [count * interval for _, count in stacks],
+        })
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "flexpro-ai-service",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
+
+
+def render_profile(sampler: StackSampler, output: str, name: str) -> Any:
+    """Render a finished sampler as ``collapsed`` text or ``speedscope`` JSON"""
+    if output == "speedscope":
+        return to_speedscope(sampler.samples, name, sampler.interval)
+    return to_collapsed(sampler.samples)
+
+
+# Only one sampling session per worker at a time
+_profile_lock = asyncio.Lock()
+
+
+async def profile_for(seconds: float, interval: float) -> StackSampler:
+    """Sample all threads for ``seconds`` without blocking the event loop"""
+    async with _profile_lock:
+        sampler = StackSampler(interval=interval).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            sampler.stop()
+    return sampler
+
+
+# Profiles captured for individual requests, fetched by id from this worker
+request_profiles = TTLCache(maxsize=64, ttl=600)
+
+RENDER_FORMATS = ("collapsed", "speedscope")
+
+
+class RequestProfilerMiddleware:
+    """
+    Profile single requests on demand
+
+    While a request whose ``X-Profile`` header matches PROFILER_REQUEST_TOKEN
+    runs, the worker's threads are sampled. The response carries
+    ``X-Profile-Id``; the profile can then be downloaded from the admin
+    profiles endpoint, which only works when it lands on the same worker.
+
+    With ``X-Profile: <token>;inline`` (or ``;inline=speedscope``) the
+    profile is the response instead: the request's own body is discarded
+    and its status is reported in ``X-Profiled-Status``, so it works with
+    any number of workers.
+    """
+
+    HEADER = b"x-profile"
+
+    def __init__(self, app, profiles_path: str = "/api/v1/admin/profiles"):
+        self.app = app
+        self.profiles_path = profiles_path
+
+    async def __call__(self, scope, receive, send):
+        token = settings.PROFILER_REQUEST_TOKEN
+        header = self._header(scope.get("headers", ())) if scope["type"] == "http" else None
+        value, _, option = (header or "").partition(";")
+        if not token or value.strip() != token:
+            await self.app(scope, receive, send)
+            return
+
+        name = f"{scope['method']} {scope['path']}"
+        mode, _, output = option.strip().partition("=")
+        if mode == "inline":
+            await self._profile_inline(scope, receive, send, name, output or "collapsed")
+            return
+
+        profile_id = uuid.uuid4().hex
+        sampler = StackSampler(interval=settings.PROFILER_INTERVAL_MS / 1000).start()
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                headers.append((b"x-profile-url", f"{self.profiles_path}/{profile_id}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            sampler.stop()
+            request_profiles.set(profile_id, (name, sampler))
+
+    async def _profile_inline(self, scope, receive, send, name: str, output: str) -> None:
+        if output not in RENDER_FORMATS:
+            output = "collapsed"
+        status = []
+
+        async def capture_status(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        sampler = StackSampler(interval=settings.PROFILER_INTERVAL_MS / 1000).start()
+        try:
+            await self.app(scope, receive, capture_status)
+        finally:
+            sampler.stop()
+
+        profile = render_profile(sampler, output, name)
+        if output == "speedscope":
+            body = json.dumps(profile).encode("utf-8")
+            content_type = b"application/json"
+        else:
+            body = profile.encode("utf-8")
+            content_type = b"text/plain; charset=utf-8"
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode()),
+                (b"cache-control", b"no-store"),
+                (b"x-profiled-status", str(status[0] if status else 500).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _header(self, headers: Iterable[Tuple[bytes, bytes]]) -> Optional[str]:
+        for name, value in headers:
+            if name == self.HEADER:
+                return value.decode("latin-1")
+        return None
@@ -0,0 +1,228 @@
+"""
+Rate limiting middleware
+Token-bucket limits per IP, per user and per route, with in-memory and Redis backends
+"""
+
+import json
+import math
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.core.auth import decode_access_token
+from app.core.config import settings
+
+logger = structlog.get_logger()
+
+
+@dataclass(frozen=True)
+class BucketResult:
+    """Outcome of taking tokens from a bucket"""
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+def _retry_after(tokens: float, cost: float, refill_rate: float) -> float:
+    if tokens >= cost:
+        return 0.0
+    return (cost - tokens) / refill_rate
+
+
+class InMemoryBackend:
+    """
+    Process-local token buckets
+
+    Buckets are spread over independently locked shards so concurrent
+    requests for different keys rarely contend on the same lock.
+    """
+
+    def __init__(self, shards: int = 16):
+        self._shards: List[Tuple[threading.Lock, Dict[str, Tuple[float, float]]]] = [
+            (threading.Lock(), {}) for _ in range(shards)
+        ]
+
+    def _shard(self, key: str) -> Tuple[threading.Lock, Dict[str, Tuple[float, float]]]:
+        return self._shards[zlib.crc32(key.encode("utf-8")) % len(self._shards)]
+
+    async def consume(self, key: str, capacity: float, refill_rate: float, cost: float = 1.0) -> BucketResult:
+        lock, buckets = self._shard(key)
+        now = time.monotonic()
+
+        with lock:
+            tokens, updated_at = buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            buckets[key] = (tokens, now)
+
+            # Drop full buckets opportunistically to keep memory bounded
+            if len(buckets) > 10000:
+                for stale_key in [k for k, (t, ts) in buckets.items() if t >= capacity or now - ts > 3600]:
+                    del buckets[stale_key]
+
+        return BucketResult(allowed, tokens, _retry_after(tokens, cost, refill_rate))
+
+
+# Atomic token bucket; uses the server clock so all workers agree on time
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBackend:
+    """
+    Token buckets shared by all workers through Redis
+
+    Accepts any asyncio Redis client with ``register_script`` (redis-py or
+    a compatible fake). If Redis is unreachable requests are allowed
+    through rather than failing the API.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis.asyncio as redis
+
+        return cls(redis.from_url(url))
+
+    async def consume(self, key: str, capacity: float, refill_rate: float, cost: float = 1.0) -> BucketResult:
+        try:
+            allowed, tokens = await self._script(
+                keys=[self._prefix + key],
+                args=[capacity, refill_rate, cost]
+            )
+        except Exception as e:
+            logger.warning("Rate limit backend unavailable", error=str(e))
+            return BucketResult(True, capacity, 0.0)
+
+        tokens = float(tokens)
+        return BucketResult(bool(int(allowed)), tokens, _retry_after(tokens, cost, refill_rate))
+
+
+def create_rate_limit_backend():
+    """Create the backend selected by RATE_LIMIT_BACKEND"""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend.from_url(settings.REDIS_URL)
+    return InMemoryBackend(shards=settings.RATE_LIMIT_SHARDS)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing token-bucket rate limits
+
+    Every request is checked against a bucket for its client IP and, when it
+    carries a valid token, one for its user. Routes listed in
+    RATE_LIMIT_ROUTES get an additional, stricter bucket per caller.
+    Limits are expressed as requests per RATE_LIMIT_WINDOW seconds.
+    """
+
+    EXEMPT_PATHS = ("/api/v1/health", "/metrics")
+
+    def __init__(self, app, backend=None):
+        self.app = app
+        self.backend = backend or create_rate_limit_backend()
+        self.window = settings.RATE_LIMIT_WINDOW
+        self.default_limit = settings.RATE_LIMIT_REQUESTS
+        # Longest prefixes first so the most specific route limit wins
+        self.route_limits = sorted(settings.RATE_LIMIT_ROUTES.items(), key=lambda item: -len(item[0]))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(self.EXEMPT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        ip = self._client_ip(scope)
+        user_id = self._user_id(scope)
+        caller = f"user:{user_id}" if user_id else f"ip:{ip}"
+
+        buckets = [(f"ip:{ip}", self.default_limit)]
+        if user_id:
+            buckets.append((caller, self.default_limit))
+        for prefix, limit in self.route_limits:
+            if scope["path"].startswith(prefix):
+                buckets.append((f"route:{prefix}:{caller}", limit))
+                break
+
+        tightest: Optional[Tuple[int, BucketResult]] = None
+        for key, limit in buckets:
+            result = await self.backend.consume(key, limit, limit / self.window)
+            if not result.allowed:
+                await self._reject(send, limit, result)
+                return
+            if tightest is None or result.remaining < tightest[1].remaining:
+                tightest = (limit, result)
+
+        limit, result = tightest
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-ratelimit-limit", str(limit).encode()))
+                headers.append((b"x-ratelimit-remaining", str(int(result.remaining)).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _client_ip(scope) -> str:
+        if settings.RATE_LIMIT_TRUST_FORWARDED:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    @staticmethod
+    def _user_id(scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer" or not token:
+                    return None
+                try:
+                    return str(decode_access_token(token).get("sub") or "") or None
+                except Exception:
+                    return None
+        return None
+
+    async def _reject(self, send, limit: int, result: BucketResult) -> None:
+        body = json.dumps({"detail": "Rate limit exceeded"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(result.retry_after))).encode()),
+                (b"x-ratelimit-limit", str(limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
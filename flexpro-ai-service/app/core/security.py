@@ -3,18 +3,94 @@ Security utilities for FlexPro AI Service
 Handles local JWT token verification (migrated from Supabase)
 """
 
-from typing import Dict, Any
-from fastapi import HTTPException, Depends
+from typing import Dict, Any, Optional
+from fastapi import HTTPException, Depends, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.auth import decode_access_token
+from app.core.tracing import span
 from app.db.database import get_db
 from app.models.sql_models import User
 
 security_scheme = HTTPBearer()
 
+# Detached snapshots of user rows, keyed on user id
+user_cache = TTLCache(maxsize=settings.AUTH_USER_CACHE_SIZE, ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+def _detached_copy(user: User) -> User:
+    """Copy a user's column values into a detached instance safe to share"""
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in User.__mapper__.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    """
+    Load a user by id, served from the user cache when possible
+
+    Cached users are merged into the session without a SELECT, so callers
+    get a normal session-bound instance either way.
+
+    Args:
+        db: Database session
+        user_id: User id
+
+    Returns:
+        User object or None if not found
+    """
+    if settings.AUTH_CACHE_ENABLED:
+        cached = user_cache.get(user_id)
+        if cached is not None:
+            return db.merge(cached, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and settings.AUTH_CACHE_ENABLED:
+        user_cache.set(user_id, _detached_copy(user))
+    return user
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    user_cache.delete(target.id)
+
+
+def user_to_dict(user: User) -> Dict[str, Any]:
+    """Dictionary view of a user, as returned by get_current_user_data"""
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "role": user.role,
+        "sub": str(user.id)
+    }
+
+
+def resolve_token_user(token: str, db: Session) -> User:
+    """
+    Verify a JWT token and load its user
+
+    Raises:
+        HTTPException: If the token is invalid or the user does not exist
+    """
+    with span("auth.decode_jwt"):
+        payload = decode_access_token(token)
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid token format")
+
+    with span("auth.load_user"):
+        user = get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
 
 async def verify_token(token: str, db: Session) -> Dict[str, Any]:
     """
@@ -30,32 +106,36 @@ async def verify_token(token: str, db: Session) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid
     """
-    try:
-        payload = decode_access_token(token)
-        user_id = int(payload.get("sub"))
-        
-        # Get user from database
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        # Return user data
-        return {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "role": user.role,
-            "sub": str(user.id)
-        }
-    except ValueError:
-        raise HTTPException(status_code=401, detail="Invalid token format")
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}")
+    return user_to_dict(resolve_token_user(token, db))
 
 
-async def get_current_user_data(
+async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
     db: Session = Depends(get_db)
+) -> User:
+    """
+    Dependency to get the current authenticated user
+
+    The single source of authentication: the token is verified and the
+    user loaded once per request, then kept on ``request.state.user``
+    (and ``request.state.user_data`` for the dict view) so every other
+    auth dependency reuses it.
+
+    Returns:
+        User object
+    """
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = resolve_token_user(credentials.credentials, db)
+        request.state.user = user
+        request.state.user_data = user_to_dict(user)
+    return user
+
+
+async def get_current_user_data(
+    request: Request,
+    user: User = Depends(get_current_user)
 ) -> Dict[str, Any]:
     """
     Dependency to get current user data from JWT token
@@ -63,8 +143,7 @@ async def get_current_user_data(
     Returns:
         User data dictionary
     """
-    token = credentials.credentials
-    return await verify_token(token, db)
+    return request.state.user_data
 
 
 def get_user_role(user_data: Dict[str, Any]) -> str:
@@ -95,4 +174,22 @@ def require_coach_role(user_data: Dict[str, Any] = Depends(get_current_user_data
         raise HTTPException(
             status_code=403,
             detail="Coach role required for this operation"
-        )
\ No newline at end of file
+        )
+
+
+def require_super_admin(
+    _: None = Depends(require_coach_role),
+    user: User = Depends(get_current_user)
+) -> User:
+    """
+    Check that the user is a coach with super admin rights
+
+    Raises:
+        HTTPException: If the user is not a super admin
+    """
+    if not user.is_super_admin:
+        raise HTTPException(
+            status_code=403,
+            detail="Super admin rights required for this operation"
+        )
+    return user
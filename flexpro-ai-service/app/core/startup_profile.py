@@ -0,0 +1,116 @@
+"""
+Startup profiling
+Reports per-module import times and time to first request
+
+Usage:
+    python -m app.main --profile-startup [--top N] [--json]
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+# Runs in a fresh interpreter started with -X importtime
+_CHILD_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from app.core.startup_profile import measure_first_request
+timings = measure_first_request(started)
+print(json.dumps(timings))
+"""
+
+
+def measure_first_request(started: float) -> Dict[str, float]:
+    """
+    Import the app, run its startup and serve one request in process
+
+    Returns:
+        Seconds spent importing, in lifespan startup and on the first request
+    """
+    import httpx
+
+    from app.main import app
+
+    imported = time.perf_counter()
+
+    async def first_request() -> Dict[str, float]:
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://profile") as client:
+                response = await client.get("/health")
+                response.raise_for_status()
+            served = time.perf_counter()
+        return {
+            "import_seconds": imported - started,
+            "startup_seconds": ready - imported,
+            "first_request_seconds": served - ready,
+            "time_to_first_request_seconds": served - started,
+        }
+
+    return asyncio.run(first_request())
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse ``-X importtime`` output into per-module self and cumulative microseconds"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return modules
+
+
+def profile_startup(top: int = 25, as_json: bool = False) -> int:
+    """Profile a cold start in a child interpreter and print a report"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_SCRIPT],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        return result.returncode
+
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    modules = parse_importtime(result.stderr)
+
+    # Group by top-level package so heavy dependencies stand out
+    packages: Dict[str, int] = {}
+    for module in modules:
+        package = module["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + module["self_us"]
+
+    report = {
+        "timings": timings,
+        "slowest_modules": sorted(modules, key=lambda m: m["self_us"], reverse=True)[:top],
+        "packages": dict(sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]),
+        "module_count": len(modules),
+    }
+
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print("Startup timings")
+    for name, seconds in timings.items():
+        print(f"  {name:<32} {seconds * 1000:10.1f} ms")
+    print(f"\nSlowest modules (self time, {len(modules)} imported)")
+    for module in report["slowest_modules"]:
+        print(f"  {module['self_us'] / 1000:10.1f} ms  {module['cumulative_us'] / 1000:10.1f} ms cum  {module['module']}")
+    print("\nImport time by package")
+    for package, self_us in report["packages"].items():
+        print(f"  {self_us / 1000:10.1f} ms  {package}")
+    return 0
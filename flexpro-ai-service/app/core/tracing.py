@@ -0,0 +1,309 @@
+"""
+Request tracing
+Context-var based spans, Server-Timing headers and OTLP-compatible JSON export
+"""
+
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import add_statement_listener, request_stats
+
+SERVICE_NAME = "flexpro-ai-service"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "kind", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent: Optional["Span"], kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    """All spans recorded while serving one request"""
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes: Any) -> Optional[Span]:
+    """
+    Start a span under the current one without making it current
+
+    For work timed outside a ``with`` block, such as SQL statements
+    reported by engine events. Returns None outside a trace; call
+    ``end()`` on the result.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return None
+    span = Span(trace, name, current_span.get(), kind, attributes)
+    trace.add(span)
+    return span
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record the enclosed block as a span, current for anything started inside it"""
+    new_span = start_span(name, **attributes)
+    if new_span is None:
+        yield None
+        return
+
+    token = current_span.set(new_span)
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.end(error=e)
+        raise
+    finally:
+        new_span.end()
+        current_span.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """Decorator recording every call of a sync or async function as a span"""
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def _record_sql_span(stats, cursor, statement, parameters, executemany, elapsed) -> None:
+    sql_span = start_span("sql", SPAN_KIND_CLIENT, **{"db.system": "sqlite", "db.statement": statement[:1000]})
+    if sql_span is not None:
+        sql_span.end()
+        sql_span.start_ns = sql_span.end_ns - int(elapsed * 1e9)
+
+
+def install_sql_tracing(engine) -> None:
+    """Record every statement on ``engine`` as a span, timed by the shared statement events"""
+    add_statement_listener(engine, _record_sql_span)
+
+
+def server_timing(trace: Trace, total_ms: float) -> str:
+    """Server-Timing header value: time and count per span name, plus the total"""
+    totals: Dict[str, List[float]] = {}
+    for recorded in trace.spans:
+        if recorded.kind == SPAN_KIND_SERVER:
+            continue
+        entry = totals.setdefault(recorded.name, [0.0, 0])
+        entry[0] += recorded.duration_ms
+        entry[1] += 1
+
+    metrics = [
+        f'{name};dur={duration:.2f};desc="{count}x"' if count > 1 else f"{name};dur={duration:.2f}"
+        for name, (duration, count) in totals.items()
+    ]
+    metrics.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(metrics)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    """A trace as an OTLP/JSON ExportTraceServiceRequest"""
+    spans = []
+    for recorded in trace.spans:
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": recorded.span_id,
+            "name": recorded.name,
+            "kind": recorded.kind,
+            "startTimeUnixNano": str(recorded.start_ns),
+            "endTimeUnixNano": str(recorded.end_ns or recorded.start_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in recorded.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": recorded.error} if recorded.error else {"code": STATUS_UNSET},
+        }
+        if recorded.parent_id:
+            otlp_span["parentSpanId"] = recorded.parent_id
+        spans.append(otlp_span)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]
+    }
+
+
+class TraceExporter(threading.Thread):
+    """
+    Background exporter for finished traces
+
+    TRACE_EXPORT is either a file path, appended to as one OTLP/JSON
+    document per line, or an OTLP/HTTP collector URL such as
+    http://collector:4318/v1/traces. Traces beyond the queue size are
+    dropped rather than slowing requests.
+    """
+
+    def __init__(self, destination: str, max_queue: int = 1000):
+        super().__init__(name="trace-exporter", daemon=True)
+        self.destination = destination
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self) -> None:
+        client = None
+        if self.destination.startswith(("http://", "https://")):
+            import httpx
+
+            client = httpx.Client(timeout=5.0)
+        else:
+            Path(self.destination).parent.mkdir(parents=True, exist_ok=True)
+
+        while True:
+            trace = self.queue.get()
+            try:
+                payload = to_otlp(trace)
+                if client is not None:
+                    client.post(self.destination, json=payload)
+                else:
+                    with open(self.destination, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(payload) + "\n")
+            except Exception as e:  # Exporting must never affect the service
+                sys.stderr.write(f"Trace export failed: {e}\n")
+
+
+_exporter: Optional[TraceExporter] = None
+
+
+def get_exporter() -> Optional[TraceExporter]:
+    global _exporter
+
+    if _exporter is None and settings.TRACE_EXPORT:
+        _exporter = TraceExporter(settings.TRACE_EXPORT)
+        _exporter.start()
+    return _exporter
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware tracing each request
+
+    Opens a server span for the request, adds a ``Server-Timing`` header
+    summarizing the spans recorded before the response started, and
+    hands sampled traces to the exporter.
+    """
+
+    def __init__(self, app, router_app):
+        self.app = app
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        with request_stats(self.router_app, scope) as stats:
+            await self._trace(scope, receive, send, stats.route)
+
+    async def _trace(self, scope, receive, send, route: str):
+        trace = Trace()
+        trace_token = current_trace.set(trace)
+        root = Span(trace, f"{scope['method']} {route}", None, SPAN_KIND_SERVER, {
+            "http.method": scope["method"],
+            "http.route": route,
+            "http.target": scope["path"],
+        })
+        trace.add(root)
+        span_token = current_span.set(root)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(trace, root.duration_ms).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            root.end(error=error)
+            current_span.reset(span_token)
+            current_trace.reset(trace_token)
+            exporter = get_exporter()
+            if exporter is not None and random.random() < settings.TRACE_SAMPLE_RATE:
+                exporter.submit(trace)
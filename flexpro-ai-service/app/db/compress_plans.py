@@ -0,0 +1,133 @@
+"""
+One-shot migration: compress existing workout plan documents
+Optionally trains a shared dictionary on existing plans first
+
+Usage:
+    python -m app.db.compress_plans [--train-dictionary] [--batch-size N]
+"""
+
+import argparse
+import logging
+import random
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.compression import (
+    CODEC_NAMES,
+    CODEC_RAW,
+    CODEC_ZLIB,
+    compress_document,
+    decompress_document,
+    dictionary_registry,
+    train_dictionary,
+    zstandard,
+)
+from app.db.database import SessionLocal, engine, init_db
+from app.models.sql_models import CompressionDictionary
+
+logger = logging.getLogger(__name__)
+
+DICTIONARY_SAMPLE_SIZE = 500
+
+
+def train_plan_dictionary(db) -> int:
+    """
+    Train and store a compression dictionary from a sample of existing plans
+
+    Returns:
+        Id of the stored dictionary, or 0 if there was nothing to train on
+    """
+    codec = CODEC_NAMES.get(settings.PLAN_COMPRESSION, CODEC_ZLIB)
+    if codec == CODEC_RAW:
+        logger.info("Compression disabled, skipping dictionary training")
+        return 0
+    if zstandard is None:
+        codec = CODEC_ZLIB
+
+    ids = [row[0] for row in db.execute(text("SELECT id FROM workout_plans")).fetchall()]
+    if not ids:
+        logger.info("No workout plans to train on")
+        return 0
+
+    sample_ids = random.sample(ids, min(DICTIONARY_SAMPLE_SIZE, len(ids)))
+    samples = []
+    for plan_id in sample_ids:
+        raw = db.execute(
+            text("SELECT data FROM workout_plans WHERE id = :id"), {"id": plan_id}
+        ).scalar()
+        samples.append(decompress_document(raw))
+
+    dictionary = CompressionDictionary(
+        codec=codec,
+        data=train_dictionary(samples, codec),
+        sample_count=len(samples)
+    )
+    db.add(dictionary)
+    db.commit()
+
+    dictionary_registry.register(dictionary.id, dictionary.codec, dictionary.data)
+    logger.info(f"Trained dictionary {dictionary.id} ({len(dictionary.data)} bytes) from {len(samples)} plans")
+    return dictionary.id
+
+
+def compress_workout_plans(db, batch_size: int = 200) -> int:
+    """
+    Rewrite every workout plan's data with the current compression settings
+
+    Rows are read and written through raw SQL so plain-JSON, previously
+    compressed and dictionary-compressed rows are all re-encoded.
+
+    Returns:
+        Number of rows rewritten
+    """
+    rewritten = 0
+    before = 0
+    after = 0
+    last_id = 0
+
+    while True:
+        rows = db.execute(
+            text("SELECT id, data FROM workout_plans WHERE id > :last_id ORDER BY id LIMIT :limit"),
+            {"last_id": last_id, "limit": batch_size}
+        ).fetchall()
+        if not rows:
+            break
+
+        updates = []
+        for plan_id, raw in rows:
+            encoded = compress_document(decompress_document(raw))
+            before += len(raw.encode("utf-8") if isinstance(raw, str) else raw)
+            after += len(encoded)
+            updates.append({"id": plan_id, "data": encoded})
+
+        db.execute(text("UPDATE workout_plans SET data = :data WHERE id = :id"), updates)
+        db.commit()
+
+        rewritten += len(rows)
+        last_id = rows[-1][0]
+
+    logger.info(f"Compressed {rewritten} workout plans: {before} -> {after} bytes")
+    return rewritten
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress stored workout plan documents")
+    parser.add_argument("--train-dictionary", action="store_true", help="Train a shared dictionary first")
+    parser.add_argument("--batch-size", type=int, default=200, help="Rows per transaction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+
+    db = SessionLocal()
+    try:
+        if args.train_dictionary:
+            train_plan_dictionary(db)
+        compress_workout_plans(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+
+    # Reclaim the space freed by the smaller rows
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
@@ -0,0 +1,225 @@
+"""
+Compressed JSON column type
+Stores large JSON documents as zlib/zstd compressed blobs with optional shared dictionaries
+"""
+
+import json
+import sqlite3
+import threading
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import LargeBinary, text
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+# zstd is optional, zlib is always available
+zstandard = lazy_import("zstandard")
+
+# One-byte codec marker at the start of every stored value
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+CODEC_NAMES = {
+    "none": CODEC_RAW,
+    "zlib": CODEC_ZLIB,
+    "zstd": CODEC_ZSTD,
+}
+
+# Compressed values: codec byte + 2-byte dictionary id (0 = no dictionary)
+_HEADER_SIZE = 3
+
+
+class _DictionaryRegistry:
+    """Process-wide registry of shared compression dictionaries"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[int, Tuple[int, bytes]] = {}
+        self._active: Dict[int, int] = {}  # codec -> dictionary id
+
+    def register(self, dictionary_id: int, codec: int, data: bytes, active: bool = True) -> None:
+        with self._lock:
+            self._dictionaries[dictionary_id] = (codec, data)
+            if active and dictionary_id >= self._active.get(codec, 0):
+                self._active[codec] = dictionary_id
+
+    def get(self, dictionary_id: int) -> bytes:
+        entry = self._dictionaries.get(dictionary_id)
+        if entry is None:
+            # Trained after this process started (compress_plans --train-dictionary)
+            entry = _read_dictionary(dictionary_id)
+            if entry is None:
+                raise LookupError(f"Compression dictionary {dictionary_id} does not exist")
+            self.register(dictionary_id, *entry)
+        return entry[1]
+
+    def active(self, codec: int) -> Tuple[int, Optional[bytes]]:
+        dictionary_id = self._active.get(codec, 0)
+        if not dictionary_id:
+            return 0, None
+        return dictionary_id, self._dictionaries[dictionary_id][1]
+
+
+dictionary_registry = _DictionaryRegistry()
+
+
+def _configured_codec() -> int:
+    codec = CODEC_NAMES.get(settings.PLAN_COMPRESSION, CODEC_ZLIB)
+    if codec == CODEC_ZSTD and zstandard is None:
+        return CODEC_ZLIB
+    return codec
+
+
+def compress_document(document: Any) -> bytes:
+    """Serialize and compress a JSON document"""
+    raw = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    codec = _configured_codec()
+    if codec == CODEC_RAW or len(raw) < settings.PLAN_COMPRESSION_MIN_BYTES:
+        return bytes([CODEC_RAW]) + raw
+
+    dictionary_id, dictionary = dictionary_registry.active(codec)
+    if codec == CODEC_ZSTD:
+        params = {"level": settings.PLAN_COMPRESSION_LEVEL}
+        if dictionary is not None:
+            params["dict_data"] = zstandard.ZstdCompressionDict(dictionary)
+        body = zstandard.ZstdCompressor(**params).compress(raw)
+    else:
+        level = settings.PLAN_COMPRESSION_LEVEL
+        if dictionary is not None:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, zdict=dictionary)
+        else:
+            compressor = zlib.compressobj(level)
+        body = compressor.compress(raw) + compressor.flush()
+
+    return bytes([codec]) + dictionary_id.to_bytes(2, "big") + body
+
+
+def decompress_document(value: Any) -> Any:
+    """Decompress and parse a stored document (legacy plain JSON is accepted)"""
+    if isinstance(value, str):
+        return json.loads(value)
+    value = bytes(value)
+    if not value:
+        return None
+
+    codec = value[0]
+    if codec == CODEC_RAW:
+        return json.loads(value[1:])
+    if codec not in (CODEC_ZLIB, CODEC_ZSTD):
+        # Rows written before compression was enabled
+        return json.loads(value)
+
+    dictionary_id = int.from_bytes(value[1:_HEADER_SIZE], "big")
+    dictionary = dictionary_registry.get(dictionary_id) if dictionary_id else None
+    body = value[_HEADER_SIZE:]
+
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed documents")
+        params = {}
+        if dictionary is not None:
+            params["dict_data"] = zstandard.ZstdCompressionDict(dictionary)
+        raw = zstandard.ZstdDecompressor(**params).decompress(body)
+    else:
+        if dictionary is not None:
+            decompressor = zlib.decompressobj(zdict=dictionary)
+        else:
+            decompressor = zlib.decompressobj()
+        raw = decompressor.decompress(body) + decompressor.flush()
+
+    return json.loads(raw)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON column stored as a compressed blob
+
+    Values are compressed on write and inflated on read. Combine with
+    ``deferred()`` so queries that do not need the document never read
+    or decompress it.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress_document(value)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+        return decompress_document(value)
+
+
+def train_dictionary(samples: List[Any], codec: int, size: int = 16 * 1024) -> bytes:
+    """
+    Build a shared compression dictionary from sample documents
+
+    zstd uses its trainer; zlib uses a preset dictionary assembled from the
+    samples (zlib only looks at the last 32KB, so the most common shapes are
+    placed at the end).
+
+    Args:
+        samples: Sample JSON documents
+        codec: CODEC_ZLIB or CODEC_ZSTD
+        size: Target dictionary size in bytes
+
+    Returns:
+        Dictionary bytes
+    """
+    encoded = [
+        json.dumps(sample, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        for sample in samples
+    ]
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to train zstd dictionaries")
+        return zstandard.train_dictionary(size, encoded).as_bytes()
+
+    size = min(size, 32 * 1024)
+    dictionary = b""
+    for sample in sorted(encoded, key=len):
+        if len(dictionary) + len(sample) > size:
+            break
+        dictionary = sample + dictionary
+    return dictionary
+
+
+def _read_dictionary(dictionary_id: int) -> Optional[Tuple[int, bytes]]:
+    """
+    Read one dictionary row on its own connection
+
+    Called while a result row is being decoded, so it must not touch the
+    engine's shared connection and its open transaction.
+    """
+    from app.db.database import DATABASE_PATH
+
+    connection = sqlite3.connect(str(DATABASE_PATH))
+    try:
+        row = connection.execute(
+            "SELECT codec, data FROM compression_dictionaries WHERE id = ?", (dictionary_id,)
+        ).fetchone()
+    finally:
+        connection.close()
+    return (row[0], bytes(row[1])) if row else None
+
+
+def load_dictionaries(connection) -> int:
+    """
+    Load all stored compression dictionaries into the registry
+
+    Returns:
+        Number of dictionaries loaded
+    """
+    rows = connection.execute(
+        text("SELECT id, codec, data FROM compression_dictionaries ORDER BY id")
+    ).fetchall()
+    for dictionary_id, codec, data in rows:
+        dictionary_registry.register(dictionary_id, codec, bytes(data))
+    return len(rows)
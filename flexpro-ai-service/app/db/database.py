@@ -5,14 +5,17 @@ Creates and manages the local SQLite database
 
 import os
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.core.tracing import span
+from app.db.compression import load_dictionaries
+
 # Get the root directory of the flexpro-ai-service
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DATABASE_PATH = BASE_DIR / "flexpro.db"
+DATABASE_PATH = Path(os.getenv("DATABASE_PATH", BASE_DIR / "flexpro.db"))
 
 # Create database URL for SQLite
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
@@ -32,27 +35,80 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
     Dependency function to get database session
+
+    Async so it runs in the request's task: the ``db.session`` span it
+    opens is current for the endpoint, so SQL spans nest under it, and
+    ends when the session is closed.
     """
     db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    with span("db.session"):
+        try:
+            yield db
+        finally:
+            db.close()
 
 
-def init_db():
+def init_db(create: bool = True):
     """
     Initialize database - create all tables
+
+    Args:
+        create: Create missing tables and columns; pass False when another
+            process has already migrated the database
     """
     # Ensure the database directory exists
     DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    if create:
+        # Create all tables
+        Base.metadata.create_all(bind=engine)
+
+        # Add columns introduced after the tables were first created
+        add_missing_columns()
+
+    with engine.connect() as conn:
+        # Readers don't block the writer, and the readiness probe watches
+        # the log's size; the mode is persistent, so this is a no-op after
+        # the first run
+        conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+        # Shared compression dictionaries must be loaded before plans are read
+        load_dictionaries(conn)
     
     return engine
 
 
+def add_missing_columns():
+    """
+    Add model columns that are missing from existing tables
+
+    SQLite's create_all never alters existing tables, so new columns are
+    added with ALTER TABLE using their (constant) server default, and any
+    missing indexes are created.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                default = getattr(column.server_default, "arg", None)
+                if isinstance(default, str):
+                    ddl += f" DEFAULT '{default}'"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+            # Indexes on newly added columns
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
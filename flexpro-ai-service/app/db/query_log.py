@@ -0,0 +1,130 @@
+"""
+SQL query diagnostics
+Slow-query logging with query plans and per-request query budgets with N+1 detection
+"""
+
+import re
+from typing import Any, Optional
+
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import RequestStats, add_statement_listener, request_stats
+
+logger = structlog.get_logger()
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so queries differing only in values compare equal"""
+    shape = _IN_LIST.sub("(?, ...)", statement)
+    shape = _NUMBER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def _format_parameters(parameters: Any, limit: int = 500) -> str:
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def explain_query_plan(cursor, statement: str, parameters: Any) -> Optional[str]:
+    """
+    SQLite's plan for a statement, one step per line
+
+    Runs on the raw DBAPI connection so it is not itself traced or counted.
+    """
+    try:
+        rows = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    except Exception:
+        return None
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _log_query(stats: Optional[RequestStats], cursor, statement, parameters, executemany, elapsed) -> None:
+    if stats is not None:
+        shape = statement_shape(statement)
+        stats.query_shapes[shape] = stats.query_shapes.get(shape, 0) + 1
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms < settings.SLOW_QUERY_MS:
+        return
+
+    plan = None
+    is_read = statement.lstrip()[:6].upper().startswith(("SELECT", "WITH"))
+    if settings.SLOW_QUERY_EXPLAIN and is_read and not executemany:
+        plan = explain_query_plan(cursor, statement, parameters)
+    logger.warning(
+        "Slow query",
+        duration_ms=round(elapsed_ms, 2),
+        statement=statement,
+        parameters=_format_parameters(parameters),
+        plan=plan,
+        route=stats.route if stats else None,
+    )
+
+
+def install_query_log(engine) -> None:
+    """Log slow statements on ``engine`` and record statement shapes per request"""
+    add_statement_listener(engine, _log_query)
+
+
+def query_budget(route: str) -> int:
+    """Statements a request to ``route`` may run before a warning"""
+    for prefix, budget in sorted(settings.QUERY_BUDGET_ROUTES.items(), key=lambda item: -len(item[0])):
+        if route.startswith(prefix):
+            return budget
+    return settings.QUERY_BUDGET_PER_REQUEST
+
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware warning about requests that run too many statements
+
+    Logs when a request exceeds its query budget, and when it repeats the
+    same statement shape QUERY_REPEAT_THRESHOLD times or more, which
+    usually means an N+1 access pattern.
+    """
+
+    def __init__(self, app, router_app):
+        self.app = app
+        self.router_app = router_app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_stats(self.router_app, scope) as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: RequestStats) -> None:
+        budget = query_budget(stats.route)
+        if stats.queries > budget:
+            logger.warning(
+                "Query budget exceeded",
+                method=scope["method"],
+                route=stats.route,
+                queries=stats.queries,
+                budget=budget,
+                query_ms=round(stats.query_seconds * 1000, 2),
+            )
+
+        repeated = [
+            {"statement": shape, "count": count}
+            for shape, count in sorted(stats.query_shapes.items(), key=lambda item: -item[1])
+            if count >= settings.QUERY_REPEAT_THRESHOLD
+        ]
+        if repeated:
+            logger.warning(
+                "Repeated query shape (possible N+1)",
+                method=scope["method"],
+                route=stats.route,
+                repeated=repeated,
+            )
@@ -0,0 +1,153 @@
+"""
+Seed data loader
+Streams catalog entries from the versioned JSON Lines files in app/db/data
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+MANIFEST_PATH = DATA_DIR / "manifest.json"
+
+# field -> (allowed types, required)
+_NUMBER = (int, float)
+SCHEMAS: Dict[str, Dict[str, Tuple[tuple, bool]]] = {
+    "exercises": {
+        "id": ((str,), True),
+        "name": ((str,), True),
+        "category": ((str,), True),
+        "primary_muscles": ((list,), True),
+        "secondary_muscles": ((list,), False),
+        "equipment": ((list,), True),
+        "difficulty": ((str,), True),
+        "description": ((str,), False),
+        "instructions": ((str,), False),
+        "default_sets": ((int,), False),
+        "default_reps": ((int,), False),
+        "default_rest": ((int,), False),
+        "rpe": ((int,), False),
+        "tempo": ((str,), False),
+        "default_duration": ((int,), False),
+        "intensity_zone": ((int,), False),
+        "tags": ((list,), False),
+    },
+    "foods": {
+        "food_id": ((str,), True),
+        "name": ((str,), True),
+        "category": ((str,), True),
+        "subcategory": ((str,), False),
+        "calories": (_NUMBER, True),
+        "protein": (_NUMBER, True),
+        "carbs": (_NUMBER, True),
+        "fat": (_NUMBER, True),
+        "fiber": (_NUMBER, False),
+        "macros": ((dict,), False),
+        "micros": ((dict,), False),
+        "protein_type": ((str,), False),
+        "protein_digestibility": (_NUMBER, False),
+        "digestion_speed": ((str,), False),
+        "glycemic_index": (_NUMBER, False),
+        "ideal_timing": ((list,), False),
+        "restrictions": ((list,), False),
+        "allergens": ((list,), False),
+        "benefits": ((str,), False),
+        "tags": ((list,), False),
+    },
+    "supplements": {
+        "supplement_id": ((str,), True),
+        "name": ((str,), True),
+        "category": ((str,), True),
+        "standard_dose": (_NUMBER, True),
+        "dose_unit": ((str,), True),
+        "frequency_per_day": ((int,), False),
+        "timing": ((list,), False),
+        "evidence_level": ((str,), True),
+        "primary_benefits": ((list,), False),
+        "secondary_benefits": ((list,), False),
+        "mechanisms": ((list,), False),
+        "meta_analysis_findings": ((str,), False),
+        "side_effects": ((list,), False),
+        "contraindications": ((list,), False),
+        "pregnancy_safe": ((bool,), False),
+        "breastfeeding_safe": ((bool,), False),
+        "goals": ((list,), False),
+        "stacks_with": ((list,), False),
+        "cost_effectiveness": ((str,), False),
+        "taste_rating": ((int,), False),
+        "mixability": ((str,), False),
+        "tags": ((list,), False),
+        "popularity_score": ((int,), False),
+        "scientific_rating": ((int,), False),
+    },
+}
+
+
+class SeedDataError(ValueError):
+    """A seed file or one of its rows is malformed"""
+
+
+def load_manifest() -> Dict[str, Any]:
+    """Read the data bundle manifest (version and dataset files)"""
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dataset_path(name: str) -> Path:
+    try:
+        return DATA_DIR / load_manifest()["datasets"][name]
+    except KeyError:
+        raise SeedDataError(f"Unknown seed dataset: {name}")
+
+
+def file_hash(name: str) -> str:
+    """Hash of the bundle version and a dataset's raw bytes, without parsing it"""
+    digest = hashlib.sha256(str(load_manifest()["version"]).encode("utf-8"))
+    with open(dataset_path(name), "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_row(name: str, row: Any, location: str) -> Dict[str, Any]:
+    """
+    Check a row against its dataset schema
+
+    Raises:
+        SeedDataError: If a required field is missing, a field is unknown or has the wrong type
+    """
+    if not isinstance(row, dict):
+        raise SeedDataError(f"{location}: expected an object, got {type(row).__name__}")
+
+    schema = SCHEMAS[name]
+    for field, (types, required) in schema.items():
+        if field not in row or row[field] is None:
+            if required:
+                raise SeedDataError(f"{location}: missing required field '{field}'")
+            continue
+        value = row[field]
+        # bool is an int subclass; only accept it where bool is expected
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            expected = "/".join(t.__name__ for t in types)
+            raise SeedDataError(f"{location}: field '{field}' must be {expected}, got {type(value).__name__}")
+
+    unknown = set(row) - set(schema)
+    if unknown:
+        raise SeedDataError(f"{location}: unknown fields {sorted(unknown)}")
+    return row
+
+
+def iter_dataset(name: str) -> Iterator[Dict[str, Any]]:
+    """Yield validated rows of a dataset one at a time"""
+    path = dataset_path(name)
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            location = f"{path.name}:{line_number}"
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise SeedDataError(f"{location}: invalid JSON ({e})")
+            yield validate_row(name, row, location)
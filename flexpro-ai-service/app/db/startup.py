@@ -0,0 +1,236 @@
+"""
+Startup coordination for multi-worker deployments
+One process migrates and seeds the database while the others wait on a file lock
+
+Usage:
+    python -m app.db.startup --build-template path/to/flexpro.template.db
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.core.config import settings
+from app.db.database import DATABASE_PATH, Base, SessionLocal, init_db
+from app.db.seed_loader import file_hash, load_manifest
+from app.models import sql_models  # noqa: F401  (registers the tables)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+LOCK_PATH = DATABASE_PATH.with_name(DATABASE_PATH.name + ".lock")
+STAMP_PATH = DATABASE_PATH.with_name(DATABASE_PATH.name + ".ready")
+
+
+@contextmanager
+def startup_lock(path: Path = LOCK_PATH, timeout: Optional[float] = None) -> Iterator[None]:
+    """
+    Hold an exclusive OS-level lock on ``path``
+
+    The lock is released by the OS if the holder dies, so a crashed worker
+    never blocks the others.
+
+    Raises:
+        TimeoutError: If the lock could not be taken within ``timeout`` seconds
+    """
+    timeout = settings.STARTUP_LOCK_TIMEOUT if timeout is None else timeout
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+
+    with open(path, "a+b") as lock_file:
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for startup lock {path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_checksum(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def schema_fingerprint() -> str:
+    """Hash of the tables and columns the models expect"""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode("utf-8"))
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def seed_fingerprint() -> str:
+    """Hash of the seed bundle version and every dataset file it lists"""
+    digest = hashlib.sha256()
+    for name in sorted(load_manifest()["datasets"]):
+        digest.update(f"{name}:{file_hash(name)}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def database_fingerprint() -> str:
+    """Hash of everything a prepared database depends on: the schema and the seed data"""
+    return hashlib.sha256(f"{schema_fingerprint()}:{seed_fingerprint()}".encode("utf-8")).hexdigest()
+
+
+def _database_is_ready(fingerprint: str) -> bool:
+    # The stamp names the schema and seed data it was written for and the
+    # database file it belongs to, so a replaced or deleted database, a new
+    # column or an edited data file all prepare it again
+    if not DATABASE_PATH.exists() or not STAMP_PATH.exists():
+        return False
+    return STAMP_PATH.read_text().strip() == f"{fingerprint} {DATABASE_PATH.stat().st_ino}"
+
+
+def _write_stamp(fingerprint: str) -> None:
+    tmp_path = STAMP_PATH.with_suffix(".tmp")
+    tmp_path.write_text(f"{fingerprint} {DATABASE_PATH.stat().st_ino}")
+    os.replace(tmp_path, STAMP_PATH)
+
+
+def install_template(template_path: Path, expected_checksum: Optional[str] = None) -> bool:
+    """
+    Copy a prebuilt database into place if none exists yet
+
+    The template's SHA-256 must match ``expected_checksum`` or, if that is
+    not given, the ``<template>.sha256`` file next to it.
+
+    Returns:
+        True if the template was installed
+    """
+    if DATABASE_PATH.exists():
+        return False
+    if not template_path.exists():
+        logger.warning(f"Database template {template_path} not found, seeding instead")
+        return False
+
+    if expected_checksum is None:
+        checksum_path = template_path.with_name(template_path.name + ".sha256")
+        if not checksum_path.exists():
+            logger.warning(f"No checksum for database template {template_path}, seeding instead")
+            return False
+        expected_checksum = checksum_path.read_text().split()[0]
+
+    # Copy first and verify the copy, so the checked bytes are the ones used
+    tmp_path = DATABASE_PATH.with_name(DATABASE_PATH.name + ".tmp")
+    shutil.copyfile(template_path, tmp_path)
+    actual_checksum = file_checksum(tmp_path)
+    if actual_checksum != expected_checksum.lower():
+        tmp_path.unlink()
+        logger.error(f"Database template checksum mismatch: {actual_checksum} != {expected_checksum}")
+        return False
+
+    os.replace(tmp_path, DATABASE_PATH)
+    logger.info(f"Installed database template {template_path}")
+    return True
+
+
+def migrate_and_seed() -> None:
+    """Create missing tables and columns, seed changed catalogs and backfill derived data"""
+    from app.db.seed import drop_relaid_tables, seed_database
+    from app.services.workout_stats import backfill_plan_stats
+
+    drop_relaid_tables()
+    init_db()
+    seed_database()
+
+    db = SessionLocal()
+    try:
+        # Fill in list-view stats for plans saved before they existed
+        backfill_plan_stats(db)
+    finally:
+        db.close()
+
+
+def prepare_database() -> None:
+    """
+    Bring the database up to date exactly once across all workers
+
+    The first process to take the lock installs the template (if
+    configured), migrates and seeds, then writes a ready stamp. Processes
+    that were waiting, and restarts with unchanged schema and seed data,
+    find the stamp and only do per-process setup, so cold start does not
+    grow with the number of workers.
+    """
+    fingerprint = database_fingerprint()
+
+    with startup_lock():
+        if _database_is_ready(fingerprint):
+            logger.info("Database schema and seed data already up to date")
+        else:
+            if settings.DATABASE_TEMPLATE_PATH:
+                install_template(Path(settings.DATABASE_TEMPLATE_PATH), settings.DATABASE_TEMPLATE_SHA256)
+            migrate_and_seed()
+            _write_stamp(fingerprint)
+            logger.info("Database migrated and seeded")
+
+    # Per-process state, e.g. compression dictionaries
+    init_db(create=False)
+
+
+def build_template(output_path: Path) -> str:
+    """
+    Build a seeded database template and its checksum file
+
+    Returns:
+        SHA-256 of the template
+    """
+    migrate_and_seed()
+
+    # Consistent single-file copy, without WAL or journal files
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.exists():
+        output_path.unlink()
+    source = sqlite3.connect(str(DATABASE_PATH))
+    try:
+        source.execute("VACUUM INTO ?", (str(output_path),))
+    finally:
+        source.close()
+
+    checksum = file_checksum(output_path)
+    output_path.with_name(output_path.name + ".sha256").write_text(f"{checksum}  {output_path.name}\n")
+    return checksum
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prepare the FlexPro database")
+    parser.add_argument("--build-template", metavar="PATH", help="Write a seeded database template to PATH")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.build_template:
+        checksum = build_template(Path(args.build_template))
+        logger.info(f"Wrote database template {args.build_template} ({checksum})")
+    else:
+        prepare_database()
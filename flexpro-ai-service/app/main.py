@@ -3,22 +3,28 @@ FlexPro AI Service - Main Application
 FastAPI microservice for AI-powered fitness program generation
 """
 
-import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import structlog
 
 from app.core.config import settings
+from app.core.auth import calibrate_bcrypt_rounds, password_hash_pool
+from app.core.cache import result_cache
+from app.core.http_compression import CompressionMiddleware
+from app.core.log_pipeline import configure_logging
+from app.core.profiler import RequestProfilerMiddleware
+from app.core.tracing import TracingMiddleware, install_sql_tracing
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, install_db_metrics, render_metrics
+from app.core.rate_limit import RateLimitMiddleware
 from app.api.v1.api import api_router
-from app.db.database import init_db
-from app.db.seed import seed_exercises, seed_default_admin_user
-from app.models.sql_models import Exercise
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
+from app.db.database import SessionLocal, engine
+from app.db.query_log import QueryBudgetMiddleware, install_query_log
+from app.db.startup import prepare_database
+from app.services.supplement_graph import supplement_graph
 
 # Configure structured logging
 structlog.configure(
@@ -39,12 +45,8 @@ structlog.configure(
     cache_logger_on_first_use=True,
 )
 
-# Configure standard logging
-logging.basicConfig(
-    format="%(message)s",
-    stream=open("logs/app.log", "a") if settings.ENVIRONMENT == "production" else None,
-    level=logging.INFO,
-)
+# Configure standard logging; records are written by a background thread
+configure_logging()
 
 logger = structlog.get_logger()
 
@@ -53,32 +55,31 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan manager"""
     logger.info("Starting FlexPro AI Service")
 
-    # Initialize SQLite database
+    # Initialize SQLite database; only one worker migrates and seeds
     try:
-        init_db()
+        prepare_database()
         logger.info("SQLite database initialized")
-        
-        # Seed database if empty
-        db = SessionLocal()
-        try:
-            exercise_count = db.query(Exercise).count()
-            if exercise_count == 0:
-                logger.info("Database is empty, seeding initial data...")
-                seed_exercises(db)
-                seed_default_admin_user(db)
-                logger.info("Database seeding completed")
-            else:
-                logger.info(f"Database already has {exercise_count} exercises")
-        finally:
-            db.close()
-            
     except Exception as e:
         logger.error("Failed to initialize database", error=str(e))
         raise
 
+    # Supplement interaction graph for stack validation
+    db = SessionLocal()
+    try:
+        supplement_graph.build(db)
+    finally:
+        db.close()
+
+    if settings.BCRYPT_AUTO_CALIBRATE:
+        calibrate_bcrypt_rounds()
+
+    await result_cache.start()
+
     yield
 
     logger.info("Shutting down FlexPro AI Service")
+    await result_cache.stop()
+    password_hash_pool.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
@@ -90,7 +91,15 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
-# Configure CORS
+# Response compression (inside tracing and metrics, so they include its cost)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Rate limiting
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+# Configure CORS (outside rate limiting, so 429 responses carry CORS headers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure appropriately for production
@@ -99,6 +108,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# SQL diagnostics
+if settings.QUERY_LOG_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware, router_app=app)
+    install_query_log(engine)
+
+# Per-request profiling via the X-Profile header
+if settings.PROFILER_REQUEST_TOKEN:
+    app.add_middleware(RequestProfilerMiddleware)
+
+# Request tracing and Server-Timing
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware, router_app=app)
+    install_sql_tracing(engine)
+
+# Metrics (outermost, so rate-limited requests are counted too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, router_app=app)
+    install_db_metrics(engine)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -116,15 +144,13 @@ app.include_router(
     prefix="/api/v1"
 )
 
-# Health check endpoint
-@app.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "service": "FlexPro AI Service",
-        "version": "1.0.0"
-    }
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
 
 # Root endpoint
 @app.get("/")
@@ -133,10 +159,23 @@ async def root():
     return {
         "message": "Welcome to FlexPro AI Service",
         "docs": "/docs",
-        "health": "/health"
+        "health": "/api/v1/health"
     }
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="FlexPro AI Service")
+    parser.add_argument("--profile-startup", action="store_true", help="Report import and startup timings, then exit")
+    parser.add_argument("--top", type=int, default=25, help="Modules to list when profiling")
+    parser.add_argument("--json", action="store_true", help="Print the startup profile as JSON")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from app.core.startup_profile import profile_startup
+
+        raise SystemExit(profile_startup(top=args.top, as_json=args.json))
+
     import uvicorn
     uvicorn.run(
         "app.main:app",
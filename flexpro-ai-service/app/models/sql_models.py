@@ -3,10 +3,12 @@ SQLAlchemy Models for Local SQLite Database
 Mirrors TypeScript interfaces from the frontend
 """
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON, LargeBinary, UniqueConstraint
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship, validates
 from app.db.database import Base
+from app.db.compression import CompressedJSON
+from app.services.workout_stats import compute_plan_stats
 
 
 class User(Base):
@@ -20,6 +22,7 @@ class User(Base):
     full_name = Column(String(255), nullable=True)
     role = Column(String(50), nullable=False, default="client")  # 'coach' or 'client'
     coach_code = Column(String(50), unique=True, nullable=True)  # For coaches
+    coach_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # For clients
     is_super_admin = Column(Integer, default=0)  # 0 or 1 (SQLite doesn't have boolean)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -29,21 +32,31 @@ class User(Base):
 
 
 class Exercise(Base):
-    """Exercise model - stores exercise data"""
+    """Exercise model with scientific parameters"""
     __tablename__ = "exercises"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    exercise_id = Column(String(100), unique=True, nullable=False, index=True)  # Original ID from TypeScript
+    id = Column(String, primary_key=True, index=True)  # e.g., 'ex_barbell_bench_press'
     name = Column(String(255), nullable=False, index=True)
-    category = Column(String(50), nullable=True)  # resistance, cardio, etc.
-    muscle_group = Column(String(100), nullable=True, index=True)
-    sub_muscle_group = Column(String(100), nullable=True)
-    equipment = Column(String(100), nullable=True)
-    type = Column(String(50), nullable=True)
-    difficulty = Column(String(50), nullable=True)
+    category = Column(String(50), nullable=False)  # resistance, cardio, etc.
+    primary_muscles = Column(JSON, nullable=False)  # List of muscle groups
+    secondary_muscles = Column(JSON, default=[])  # List of muscle groups
+    equipment = Column(JSON, nullable=False)  # List of equipment
+    difficulty = Column(String(50), nullable=False)  # beginner, intermediate, advanced, elite
+    description = Column(Text, nullable=True)
+    instructions = Column(Text, nullable=True)
+    
+    # Scientific parameters (varies by category)
+    default_sets = Column(Integer, nullable=True)
+    default_reps = Column(Integer, nullable=True)
+    default_rest = Column(Integer, nullable=True)  # seconds
+    rpe = Column(Integer, nullable=True)  # Rate of Perceived Exertion
+    tempo = Column(String(20), nullable=True)  # e.g., '3-0-1-0'
+    
+    # Cardio parameters
+    default_duration = Column(Integer, nullable=True)  # minutes
+    intensity_zone = Column(Integer, nullable=True)  # 1-5
     
-    # Store complex exercise data as JSON
-    scientific_data = Column(JSON, nullable=True)  # Stores full exercise object as JSON
+    tags = Column(JSON, default=[])
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -148,15 +161,76 @@ class WorkoutPlan(Base):
 
     # Store entire workout plan as JSON for flexibility
     # This matches the structure: { days: { 1: [...], 2: [...] }, ... }
-    data = Column(JSON, nullable=False)
+    # Stored compressed and deferred: only loaded when accessed or undeferred
+    data = deferred(Column(CompressedJSON, nullable=False))
 
     plan_name = Column(String(255), nullable=True)
     plan_type = Column(String(50), nullable=True)  # 'training', 'nutrition', etc.
 
+    # Precomputed from data so list views never need to load it
+    day_count = Column(Integer, nullable=True)
+    exercise_count = Column(Integer, nullable=True)
+
+    # Optimistic concurrency: bumped on every update, exposed as the ETag
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User", back_populates="workout_plans")
+    revisions = relationship("WorkoutPlanRevision", back_populates="workout_plan", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"version_id_col": version}
+
+    @validates("data")
+    def _update_stats(self, key, data):
+        self.day_count, self.exercise_count = compute_plan_stats(data)
+        return data
+
+
+class WorkoutPlanRevision(Base):
+    """
+    Historical version of a workout plan's data
+
+    Each row describes the plan data as it was at ``version``: either a full
+    snapshot, or a reverse JSON Patch that turns the next newer version back
+    into this one.
+    """
+    __tablename__ = "workout_plan_revisions"
+    __table_args__ = (UniqueConstraint("workout_plan_id", "version", name="uq_workout_plan_revision_version"),)
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    workout_plan_id = Column(Integer, ForeignKey("workout_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    version = Column(Integer, nullable=False)
+
+    snapshot = Column(JSON(none_as_null=True), nullable=True)  # Full plan data (every N revisions)
+    diff = Column(JSON(none_as_null=True), nullable=True)  # Reverse JSON Patch from version + 1
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    workout_plan = relationship("WorkoutPlan", back_populates="revisions")
+
+
+class CompressionDictionary(Base):
+    """Shared dictionary used to compress JSON documents"""
+    __tablename__ = "compression_dictionaries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    codec = Column(Integer, nullable=False)  # See app.db.compression CODEC_* constants
+    data = Column(LargeBinary, nullable=False)
+    sample_count = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SeedState(Base):
+    """Content hash of the last seeded version of each catalog dataset"""
+    __tablename__ = "seed_state"
 
+    dataset = Column(String(100), primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    row_count = Column(Integer, nullable=False)
 
+    seeded_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,6 +1,8 @@
 """
-Extended SQLAlchemy Models for Exercises, Foods, and Supplements
+Extended SQLAlchemy Models for Foods and Supplements
 Compatible with the seed.py data structure
+
+Exercises are declared once, in app.models.sql_models
 """
 
 from sqlalchemy import Column, Integer, String, Text, Float, JSON, DateTime
@@ -8,37 +10,6 @@ from sqlalchemy.sql import func
 from app.db.database import Base
 
 
-class Exercise(Base):
-    """Exercise model with scientific parameters"""
-    __tablename__ = "exercises"
-
-    id = Column(String, primary_key=True, index=True)  # e.g., 'ex_barbell_bench_press'
-    name = Column(String(255), nullable=False, index=True)
-    category = Column(String(50), nullable=False)  # resistance, cardio, etc.
-    primary_muscles = Column(JSON, nullable=False)  # List of muscle groups
-    secondary_muscles = Column(JSON, default=[])  # List of muscle groups
-    equipment = Column(JSON, nullable=False)  # List of equipment
-    difficulty = Column(String(50), nullable=False)  # beginner, intermediate, advanced, elite
-    description = Column(Text, nullable=True)
-    instructions = Column(Text, nullable=True)
-    
-    # Scientific parameters (varies by category)
-    default_sets = Column(Integer, nullable=True)
-    default_reps = Column(Integer, nullable=True)
-    default_rest = Column(Integer, nullable=True)  # seconds
-    rpe = Column(Integer, nullable=True)  # Rate of Perceived Exertion
-    tempo = Column(String(20), nullable=True)  # e.g., '3-0-1-0'
-    
-    # Cardio parameters
-    default_duration = Column(Integer, nullable=True)  # minutes
-    intensity_zone = Column(Integer, nullable=True)  # 1-5
-    
-    tags = Column(JSON, default=[])
-    
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
-
-
 class Food(Base):
     """Food model with complete nutritional data"""
     __tablename__ = "foods"
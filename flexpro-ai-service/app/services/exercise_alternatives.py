@@ -0,0 +1,304 @@
+"""
+Exercise alternative index
+Precomputed similarity index used to suggest exercise substitutions
+"""
+
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import result_cache
+from app.models.sql_models import Exercise
+
+
+# Relative weight of each similarity component (sums to 1.0)
+SIMILARITY_WEIGHTS = {
+    'primary_muscles': 0.45,
+    'secondary_muscles': 0.20,
+    'tags': 0.15,
+    'difficulty': 0.10,
+    'equipment': 0.10,
+}
+
+# Tags that describe the movement pattern and count double in tag overlap
+MOVEMENT_TAGS = {'compound', 'isolation', 'unilateral', 'isometric', 'bodyweight', 'cardio'}
+
+DIFFICULTY_LEVELS = {
+    'beginner': 0,
+    'intermediate': 1,
+    'advanced': 2,
+    'elite': 3,
+}
+
+# Muscles that should be avoided for a given injury
+INJURY_MUSCLES = {
+    'shoulder': {'shoulders', 'chest'},
+    'elbow': {'triceps', 'biceps', 'forearms'},
+    'wrist': {'forearms'},
+    'back': {'back', 'lower_back', 'traps'},
+    'lower_back': {'lower_back', 'back'},
+    'hip': {'glutes', 'hamstrings'},
+    'knee': {'quads', 'hamstrings', 'calves'},
+    'ankle': {'calves'},
+}
+
+# Equipment that never has to be available
+NO_EQUIPMENT = {'none', 'bodyweight'}
+
+
+class _ExerciseFeatures:
+    """Immutable feature snapshot of a single exercise"""
+
+    __slots__ = ('id', 'primary', 'secondary', 'tags', 'equipment', 'difficulty')
+
+    def __init__(self, exercise: Exercise):
+        self.id = exercise.id
+        self.primary = frozenset(exercise.primary_muscles or [])
+        self.secondary = frozenset(exercise.secondary_muscles or [])
+        self.tags = frozenset(exercise.tags or [])
+        self.equipment = frozenset(exercise.equipment or [])
+        self.difficulty = DIFFICULTY_LEVELS.get(exercise.difficulty, 1)
+
+    @property
+    def muscles(self) -> frozenset:
+        return self.primary | self.secondary
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard overlap of two sets (1.0 when both are empty)"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _tag_overlap(a: frozenset, b: frozenset) -> float:
+    """Tag overlap where movement-pattern tags weigh twice as much"""
+    union = a | b
+    if not union:
+        return 1.0
+
+    def weight(tags: frozenset) -> int:
+        return sum(2 if tag in MOVEMENT_TAGS else 1 for tag in tags)
+
+    return weight(a & b) / weight(union)
+
+
+def similarity(a: _ExerciseFeatures, b: _ExerciseFeatures) -> float:
+    """
+    Weighted similarity between two exercises
+
+    Returns:
+        Score between 0.0 (unrelated) and 1.0 (identical profile)
+    """
+    max_gap = max(DIFFICULTY_LEVELS.values())
+    difficulty_score = 1.0 - abs(a.difficulty - b.difficulty) / max_gap
+
+    score = (
+        SIMILARITY_WEIGHTS['primary_muscles'] * _jaccard(a.primary, b.primary)
+        + SIMILARITY_WEIGHTS['secondary_muscles'] * _jaccard(a.secondary, b.secondary)
+        + SIMILARITY_WEIGHTS['tags'] * _tag_overlap(a.tags, b.tags)
+        + SIMILARITY_WEIGHTS['difficulty'] * difficulty_score
+        + SIMILARITY_WEIGHTS['equipment'] * _jaccard(a.equipment, b.equipment)
+    )
+    return round(score, 4)
+
+
+class ExerciseAlternativeIndex:
+    """
+    In-memory similarity index over the exercise catalog
+
+    The index is built once from the database and then kept up to date by
+    ORM events as transactions commit, so lookups never have to scan the
+    exercises table. Writes made by other workers arrive through the
+    result cache's invalidation channel and mark the index for a rebuild.
+    Only exercises sharing at least one primary or secondary muscle are
+    considered candidates for each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._features: Dict[str, _ExerciseFeatures] = {}
+        self._by_muscle: Dict[str, Set[str]] = {}
+        self._scores: Dict[str, Dict[str, float]] = {}
+        self._ranked: Dict[str, List[Tuple[str, float]]] = {}
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def build(self, db: Session) -> None:
+        """Build the full index from the exercises table"""
+        exercises = db.query(Exercise).all()
+
+        with self._lock:
+            self._features.clear()
+            self._by_muscle.clear()
+            self._scores.clear()
+            self._ranked.clear()
+
+            for exercise in exercises:
+                self._add_features(_ExerciseFeatures(exercise))
+            for exercise_id in self._features:
+                self._scores[exercise_id] = self._score_candidates(exercise_id)
+
+            self._built = True
+
+    def ensure_built(self, db: Session) -> None:
+        """Build the index on first use"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build(db)
+
+    def invalidate(self) -> None:
+        """Rebuild the index on next use"""
+        with self._lock:
+            self._built = False
+
+    def upsert(self, exercise: Exercise) -> None:
+        """Add or refresh a single exercise"""
+        self._upsert_features(_ExerciseFeatures(exercise))
+
+    def apply(self, changes: Dict[str, Optional[_ExerciseFeatures]]) -> None:
+        """Apply committed changes: a snapshot per upserted exercise, None per deleted one"""
+        for exercise_id, features in changes.items():
+            if features is None:
+                self.remove(exercise_id)
+            else:
+                self._upsert_features(features)
+
+    def _upsert_features(self, features: _ExerciseFeatures) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            self._remove(features.id)
+            self._add_features(features)
+
+            scores = self._score_candidates(features.id)
+            self._scores[features.id] = scores
+            for other_id, score in scores.items():
+                self._scores[other_id][features.id] = score
+                self._ranked.pop(other_id, None)
+
+    def remove(self, exercise_id: str) -> None:
+        """Drop a single exercise from the index"""
+        with self._lock:
+            if self._built:
+                self._remove(exercise_id)
+
+    def alternatives(
+        self,
+        exercise_id: str,
+        equipment: Optional[List[str]] = None,
+        exclude_injuries: Optional[List[str]] = None,
+        k: int = 5
+    ) -> List[Tuple[str, float]]:
+        """
+        Get ranked substitutes for an exercise
+
+        Args:
+            exercise_id: Exercise to replace
+            equipment: Equipment the client has access to (None = anything)
+            exclude_injuries: Injuries whose loaded muscles should be avoided
+            k: Maximum number of alternatives
+
+        Returns:
+            List of (exercise_id, score) tuples, best match first
+        """
+        with self._lock:
+            if exercise_id not in self._features:
+                return []
+            ranked = self._ranked.get(exercise_id)
+            if ranked is None:
+                ranked = sorted(
+                    self._scores[exercise_id].items(),
+                    key=lambda item: (-item[1], item[0])
+                )
+                self._ranked[exercise_id] = ranked
+            features = self._features
+
+        available = set(equipment) | NO_EQUIPMENT if equipment else None
+        avoided: Set[str] = set()
+        for injury in exclude_injuries or []:
+            avoided |= INJURY_MUSCLES.get(injury.lower(), {injury.lower()})
+
+        results = []
+        for candidate_id, score in ranked:
+            candidate = features.get(candidate_id)
+            if candidate is None:
+                continue
+            if available is not None and not candidate.equipment <= available:
+                continue
+            if avoided and candidate.primary & avoided:
+                continue
+            results.append((candidate_id, score))
+            if len(results) >= k:
+                break
+
+        return results
+
+    def _add_features(self, features: _ExerciseFeatures) -> None:
+        self._features[features.id] = features
+        for muscle in features.muscles:
+            self._by_muscle.setdefault(muscle, set()).add(features.id)
+
+    def _remove(self, exercise_id: str) -> None:
+        features = self._features.pop(exercise_id, None)
+        if features is None:
+            return
+        for muscle in features.muscles:
+            ids = self._by_muscle.get(muscle)
+            if ids is not None:
+                ids.discard(exercise_id)
+                if not ids:
+                    del self._by_muscle[muscle]
+        for other_id in self._scores.pop(exercise_id, {}):
+            self._scores.get(other_id, {}).pop(exercise_id, None)
+            self._ranked.pop(other_id, None)
+        self._ranked.pop(exercise_id, None)
+
+    def _score_candidates(self, exercise_id: str) -> Dict[str, float]:
+        features = self._features[exercise_id]
+        candidates: Set[str] = set()
+        for muscle in features.muscles:
+            candidates |= self._by_muscle.get(muscle, set())
+        candidates.discard(exercise_id)
+
+        return {
+            candidate_id: similarity(features, self._features[candidate_id])
+            for candidate_id in candidates
+        }
+
+
+# Global index instance
+exercise_alternative_index = ExerciseAlternativeIndex()
+
+
+result_cache.subscribe("exercises", exercise_alternative_index.invalidate)
+
+
+# Snapshots are taken at flush time and only reach the index once the
+# transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_exercise_changes(session: Session, flush_context) -> None:
+    changes = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Exercise):
+            if changes is None:
+                changes = session.info.setdefault("exercise_changes", {})
+            changes[obj.id] = None if obj in session.deleted else _ExerciseFeatures(obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_exercise_changes(session: Session) -> None:
+    changes = session.info.pop("exercise_changes", None)
+    if changes:
+        exercise_alternative_index.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_exercise_changes(session: Session) -> None:
+    session.info.pop("exercise_changes", None)
@@ -0,0 +1,206 @@
+"""
+JSON Patch utilities
+Implements RFC 6902 (JSON Patch) and RFC 7396 (JSON Merge Patch) for plan documents
+"""
+
+import copy
+from typing import Any, Dict, List, Tuple
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch is malformed or cannot be applied"""
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    """Split an RFC 6901 JSON pointer into unescaped reference tokens"""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise JsonPatchError(f"Invalid array index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchError(f"Array index out of range: {index}")
+    return index
+
+
+def _resolve_parent(document: Any, tokens: List[str]) -> Tuple[Any, str]:
+    """Walk to the container holding the last token of a pointer"""
+    if not tokens:
+        raise JsonPatchError("Operation cannot target the document root")
+    target = document
+    for token in tokens[:-1]:
+        if isinstance(target, dict):
+            if token not in target:
+                raise JsonPatchError(f"Path segment not found: {token!r}")
+            target = target[token]
+        elif isinstance(target, list):
+            target = target[_list_index(target, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"Cannot traverse into scalar at {token!r}")
+    return target, tokens[-1]
+
+
+def _get(document: Any, pointer: str) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return document
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: {pointer}")
+        return parent[key]
+    if isinstance(parent, list):
+        return parent[_list_index(parent, key, allow_end=False)]
+    raise JsonPatchError(f"Path not found: {pointer}")
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, key, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"Cannot add to scalar at {pointer}")
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    tokens = _parse_pointer(pointer)
+    parent, key = _resolve_parent(document, tokens)
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JsonPatchError(f"Path not found: {pointer}")
+        return document, parent.pop(key)
+    if isinstance(parent, list):
+        return document, parent.pop(_list_index(parent, key, allow_end=False))
+    raise JsonPatchError(f"Cannot remove from scalar at {pointer}")
+
+
+def apply_json_patch(document: Any, operations: List[Dict[str, Any]]) -> Any:
+    """
+    Apply an RFC 6902 JSON Patch
+
+    The input document is never mutated; operations are applied atomically
+    to a copy.
+
+    Args:
+        document: JSON document to patch
+        operations: List of patch operations
+
+    Returns:
+        Patched copy of the document
+
+    Raises:
+        JsonPatchError: If an operation is invalid or fails
+    """
+    result = copy.deepcopy(document)
+
+    for operation in operations:
+        if not isinstance(operation, dict):
+            raise JsonPatchError("Patch operations must be objects")
+        op = operation.get("op")
+        path = operation.get("path")
+        if not isinstance(path, str):
+            raise JsonPatchError("Patch operation is missing 'path'")
+
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"'{op}' operation requires 'value'")
+        if op in ("move", "copy") and not isinstance(operation.get("from"), str):
+            raise JsonPatchError(f"'{op}' operation requires 'from'")
+
+        if op == "add":
+            result = _add(result, path, copy.deepcopy(operation["value"]))
+        elif op == "remove":
+            result, _ = _remove(result, path)
+        elif op == "replace":
+            _get(result, path)
+            if _parse_pointer(path):
+                result, _ = _remove(result, path)
+            result = _add(result, path, copy.deepcopy(operation["value"]))
+        elif op == "move":
+            source = operation["from"]
+            if path.startswith(source + "/"):
+                raise JsonPatchError("Cannot move a value into one of its children")
+            result, value = _remove(result, source)
+            result = _add(result, path, value)
+        elif op == "copy":
+            value = copy.deepcopy(_get(result, operation["from"]))
+            result = _add(result, path, value)
+        elif op == "test":
+            if _get(result, path) != operation["value"]:
+                raise JsonPatchError(f"Test failed at {path}")
+        else:
+            raise JsonPatchError(f"Unsupported patch operation: {op!r}")
+
+    return result
+
+
+def apply_merge_patch(document: Any, patch: Any) -> Any:
+    """
+    Apply an RFC 7396 JSON Merge Patch
+
+    Returns:
+        Patched copy of the document
+    """
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+
+    result = copy.deepcopy(document) if isinstance(document, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _escape_token(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def make_json_patch(source: Any, target: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute an RFC 6902 JSON Patch that turns ``source`` into ``target``
+
+    Objects and equal-length arrays are diffed recursively; anything else
+    that differs is replaced wholesale.
+
+    Returns:
+        List of patch operations (empty when the documents are equal)
+    """
+    if source == target:
+        return []
+
+    if isinstance(source, dict) and isinstance(target, dict):
+        operations = []
+        for key in source:
+            if key not in target:
+                operations.append({"op": "remove", "path": f"{path}/{_escape_token(key)}"})
+        for key, value in target.items():
+            child = f"{path}/{_escape_token(key)}"
+            if key not in source:
+                operations.append({"op": "add", "path": child, "value": copy.deepcopy(value)})
+            else:
+                operations.extend(make_json_patch(source[key], value, child))
+        return operations
+
+    if isinstance(source, list) and isinstance(target, list) and len(source) == len(target):
+        operations = []
+        for index, (old, new) in enumerate(zip(source, target)):
+            operations.extend(make_json_patch(old, new, f"{path}/{index}"))
+        return operations
+
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(target)}]
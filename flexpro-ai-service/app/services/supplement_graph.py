@@ -0,0 +1,349 @@
+"""
+Supplement interaction graph
+Precomputed synergy and conflict adjacency used to validate supplement stacks
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import result_cache
+from app.models.sql_models import Supplement
+
+SYNERGY = "synergy"
+CONFLICT = "conflict"
+
+# Words that say nothing about which condition is meant
+GENERIC_CONDITION_WORDS = frozenset({"condition", "conditions", "disease", "diseases", "disorder", "disorders"})
+
+
+def normalize(reference: str) -> str:
+    """Canonical form of a supplement reference ("Beta-Alanine" -> "beta_alanine")"""
+    return re.sub(r"[\s\-]+", "_", str(reference).strip().lower())
+
+
+def condition_tokens(condition: str) -> frozenset:
+    """Significant words of a health condition ("Kidney disease" -> {"kidney"})"""
+    return frozenset(re.findall(r"[a-z0-9]+", str(condition).lower())) - GENERIC_CONDITION_WORDS
+
+
+class _SupplementNode:
+    """Immutable snapshot of the graph-relevant fields of a supplement"""
+
+    __slots__ = (
+        'id', 'supplement_id', 'name', 'category', 'keys',
+        'stacks_with', 'interactions', 'interaction_labels', 'contraindications',
+    )
+
+    def __init__(self, supplement: Supplement):
+        self.id = supplement.id
+        self.supplement_id = supplement.supplement_id
+        self.name = supplement.name
+        self.category = normalize(supplement.category) if supplement.category else None
+        # Every reference that names this supplement directly
+        self.keys = frozenset(
+            normalize(key)
+            for key in [supplement.supplement_id, supplement.name, *(supplement.common_names or [])]
+            if key
+        )
+        self.stacks_with = tuple(normalize(ref) for ref in supplement.stacks_with or [])
+        self.interactions = tuple(normalize(ref) for ref in supplement.interactions or [])
+        self.interaction_labels = {normalize(ref): str(ref) for ref in supplement.interactions or []}
+        self.contraindications = tuple(str(item) for item in supplement.contraindications or [])
+
+
+class SupplementGraph:
+    """
+    In-memory graph of supplement synergies and conflicts
+
+    ``stacks_with`` entries become synergy edges and ``interactions``
+    entries conflict edges. References may name a supplement (by
+    supplement_id, name or common name) or a whole category. Edges are
+    symmetric: declaring one side is enough. Interactions naming nothing
+    in the catalog (medications, for example) are kept as warnings, and
+    contraindications are indexed by the significant words of the
+    condition, so "kidney disease" and "Chronic kidney disease" match
+    each other but "heart" never matches "heartburn".
+
+    The graph is built once from the database and then kept up to date by
+    ORM events. Changes are applied when their transaction commits, and
+    re-resolve only the changed supplement and the supplements whose
+    references name it. Writes made by other workers arrive through the
+    result cache's invalidation channel and mark the graph for a rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = False
+        self._nodes: Dict[int, _SupplementNode] = {}
+        self._by_key: Dict[str, int] = {}
+        self._by_category: Dict[str, Set[int]] = {}
+        # kind -> source id -> resolved targets it declared, and the reverse
+        self._declared: Dict[str, Dict[int, Set[int]]] = {SYNERGY: {}, CONFLICT: {}}
+        self._declared_by: Dict[str, Dict[int, Set[int]]] = {SYNERGY: {}, CONFLICT: {}}
+        # Normalized reference -> supplements whose stacks_with/interactions use it
+        self._referenced_by: Dict[str, Set[int]] = {}
+        self._external: Dict[int, List[str]] = {}
+        self._by_condition: Dict[frozenset, Set[int]] = {}
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def build(self, db: Session) -> None:
+        """Build the full graph from the supplements table"""
+        supplements = db.query(Supplement).all()
+
+        with self._lock:
+            self._nodes.clear()
+            self._by_key.clear()
+            self._by_category.clear()
+            for kind in (SYNERGY, CONFLICT):
+                self._declared[kind].clear()
+                self._declared_by[kind].clear()
+            self._referenced_by.clear()
+            self._external.clear()
+            self._by_condition.clear()
+
+            nodes = [_SupplementNode(supplement) for supplement in supplements]
+            for node in nodes:
+                self._add_node(node)
+            for node in nodes:
+                self._resolve_edges(node.id)
+
+            self._built = True
+
+    def ensure_built(self, db: Session) -> None:
+        """Build the graph on first use"""
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.build(db)
+
+    def invalidate(self) -> None:
+        """Rebuild the graph on next use"""
+        with self._lock:
+            self._built = False
+
+    def upsert(self, supplement: Supplement) -> None:
+        """Add or refresh a single supplement"""
+        self._upsert_node(_SupplementNode(supplement))
+
+    def apply(self, changes: Dict[int, Optional[_SupplementNode]]) -> None:
+        """Apply committed changes: a snapshot per upserted supplement, None per deleted one"""
+        for supplement_id, node in changes.items():
+            if node is None:
+                self.remove(supplement_id)
+            else:
+                self._upsert_node(node)
+
+    def _upsert_node(self, node: _SupplementNode) -> None:
+        with self._lock:
+            if not self._built:
+                return
+            old = self._nodes.get(node.id)
+            affected = self._referencing(old) if old is not None else set()
+            self._remove_node(node.id)
+            self._add_node(node)
+            affected |= self._referencing(node)
+            affected.add(node.id)
+            for supplement_id in affected:
+                if supplement_id in self._nodes:
+                    self._resolve_edges(supplement_id)
+
+    def remove(self, supplement_id: int) -> None:
+        """Drop a single supplement from the graph"""
+        with self._lock:
+            node = self._nodes.get(supplement_id)
+            if not self._built or node is None:
+                return
+            affected = self._referencing(node)
+            self._remove_node(supplement_id)
+            for other_id in affected:
+                if other_id in self._nodes:
+                    self._resolve_edges(other_id)
+
+    def node(self, supplement_id: int) -> Optional[_SupplementNode]:
+        return self._nodes.get(supplement_id)
+
+    def resolve(self, reference: str) -> Optional[int]:
+        """Id of the supplement a client reference names (numeric id, supplement_id or name)"""
+        with self._lock:
+            if str(reference).isdigit() and int(reference) in self._nodes:
+                return int(reference)
+            return self._by_key.get(normalize(reference))
+
+    def neighbors(self, supplement_id: int, kind: str) -> Set[int]:
+        """Supplements connected to ``supplement_id`` by a synergy or conflict edge"""
+        with self._lock:
+            return (
+                self._declared[kind].get(supplement_id, set())
+                | self._declared_by[kind].get(supplement_id, set())
+            )
+
+    def external_interactions(self, supplement_id: int) -> List[str]:
+        """Interactions of a supplement with things outside the catalog, e.g. medications"""
+        with self._lock:
+            return list(self._external.get(supplement_id, []))
+
+    def validate(self, supplement_ids: Iterable[int], conditions: Iterable[str] = ()) -> Dict[str, list]:
+        """
+        Check a proposed stack
+
+        Returns:
+            Dict of conflict and synergy pairs within the stack, external
+            interaction warnings, and (supplement id, condition) pairs for
+            contraindicated conditions
+        """
+        stack = list(dict.fromkeys(supplement_ids))
+        members = set(stack)
+        wanted = {}
+        for condition in conditions:
+            tokens = condition_tokens(condition)
+            if tokens:
+                wanted.setdefault(tokens, condition)
+
+        conflicts: List[Tuple[int, int]] = []
+        synergies: List[Tuple[int, int]] = []
+        with self._lock:
+            for index, supplement_id in enumerate(stack):
+                later = set(stack[index + 1:])
+                for other_id in sorted(self.neighbors(supplement_id, CONFLICT) & later):
+                    conflicts.append((supplement_id, other_id))
+                for other_id in sorted(self.neighbors(supplement_id, SYNERGY) & later):
+                    synergies.append((supplement_id, other_id))
+
+            warnings = [
+                (supplement_id, interaction)
+                for supplement_id in stack
+                for interaction in self._external.get(supplement_id, [])
+            ]
+
+            contraindicated = []
+            for tokens, condition in wanted.items():
+                # One condition's words all appear in the other's
+                matched: Set[int] = set()
+                for indexed, supplement_ids in self._by_condition.items():
+                    if tokens <= indexed or indexed <= tokens:
+                        matched |= supplement_ids & members
+                contraindicated.extend((supplement_id, condition) for supplement_id in sorted(matched))
+
+        return {
+            "conflicts": conflicts,
+            "synergies": synergies,
+            "warnings": warnings,
+            "contraindicated": contraindicated,
+        }
+
+    def _targets(self, reference: str, source_id: int) -> Set[int]:
+        supplement_id = self._by_key.get(reference)
+        if supplement_id is not None:
+            targets = {supplement_id}
+        else:
+            targets = set(self._by_category.get(reference, ()))
+        targets.discard(source_id)
+        return targets
+
+    def _referencing(self, node: _SupplementNode) -> Set[int]:
+        affected: Set[int] = set()
+        for key in node.keys | ({node.category} if node.category else set()):
+            affected |= self._referenced_by.get(key, set())
+        return affected
+
+    def _add_node(self, node: _SupplementNode) -> None:
+        self._nodes[node.id] = node
+        for key in node.keys:
+            self._by_key.setdefault(key, node.id)
+        if node.category:
+            self._by_category.setdefault(node.category, set()).add(node.id)
+        for reference in node.stacks_with + node.interactions:
+            self._referenced_by.setdefault(reference, set()).add(node.id)
+        for condition in node.contraindications:
+            tokens = condition_tokens(condition)
+            if tokens:
+                self._by_condition.setdefault(tokens, set()).add(node.id)
+
+    def _remove_node(self, supplement_id: int) -> None:
+        node = self._nodes.pop(supplement_id, None)
+        if node is None:
+            return
+        for key in node.keys:
+            if self._by_key.get(key) == supplement_id:
+                del self._by_key[key]
+                # Another supplement may share the name
+                for other in self._nodes.values():
+                    if key in other.keys:
+                        self._by_key[key] = other.id
+                        break
+        if node.category:
+            _discard(self._by_category, node.category, supplement_id)
+        for reference in node.stacks_with + node.interactions:
+            _discard(self._referenced_by, reference, supplement_id)
+        for condition in node.contraindications:
+            _discard(self._by_condition, condition_tokens(condition), supplement_id)
+        self._clear_edges(supplement_id)
+
+    def _clear_edges(self, supplement_id: int) -> None:
+        for kind in (SYNERGY, CONFLICT):
+            for target_id in self._declared[kind].pop(supplement_id, set()):
+                _discard(self._declared_by[kind], target_id, supplement_id)
+        self._external.pop(supplement_id, None)
+
+    def _resolve_edges(self, supplement_id: int) -> None:
+        """Re-resolve the references declared by one supplement"""
+        self._clear_edges(supplement_id)
+        node = self._nodes[supplement_id]
+
+        for kind, references in ((SYNERGY, node.stacks_with), (CONFLICT, node.interactions)):
+            declared: Set[int] = set()
+            for reference in references:
+                targets = self._targets(reference, supplement_id)
+                if not targets and kind == CONFLICT:
+                    self._external.setdefault(supplement_id, []).append(node.interaction_labels[reference])
+                declared |= targets
+            if declared:
+                self._declared[kind][supplement_id] = declared
+                for target_id in declared:
+                    self._declared_by[kind].setdefault(target_id, set()).add(supplement_id)
+
+
+def _discard(index: Dict, key, value) -> None:
+    values = index.get(key)
+    if values is not None:
+        values.discard(value)
+        if not values:
+            del index[key]
+
+
+# Global graph instance
+supplement_graph = SupplementGraph()
+
+
+result_cache.subscribe("supplements", supplement_graph.invalidate)
+
+
+# Snapshots are taken at flush time, while the rows are loaded, and only
+# reach the graph once the transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_supplement_changes(session: Session, flush_context) -> None:
+    changes = None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Supplement):
+            if changes is None:
+                changes = session.info.setdefault("supplement_changes", {})
+            changes[obj.id] = None if obj in session.deleted else _SupplementNode(obj)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_supplement_changes(session: Session) -> None:
+    changes = session.info.pop("supplement_changes", None)
+    if changes:
+        supplement_graph.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_supplement_changes(session: Session) -> None:
+    session.info.pop("supplement_changes", None)
@@ -7,6 +7,8 @@ import random
 from typing import List, Dict, Any, Optional
 from app.models.schemas import ClientProfile, WorkoutPlan
 from app.db.supabase import get_exercises_by_muscle_groups
+from app.core.cache import cache_key, result_cache
+from app.core.tracing import span
 
 
 class WorkoutGenerator:
@@ -61,13 +63,16 @@ class WorkoutGenerator:
             WorkoutPlan: Generated workout plan
         """
         # Determine split type
-        split_type = self._determine_split(profile)
+        with span("generator.split"):
+            split_type = self._determine_split(profile)
 
         # Get available exercises (filtered by injuries and equipment)
-        available_exercises = await self._get_available_exercises(profile)
+        with span("generator.exercises"):
+            available_exercises = await self._get_available_exercises(profile)
 
         # Generate workouts for each training day
-        workouts = self._generate_workouts(split_type, profile, available_exercises)
+        with span("generator.workouts"):
+            workouts = self._generate_workouts(split_type, profile, available_exercises)
 
         return WorkoutPlan(
             split_type=split_type,
@@ -91,7 +96,12 @@ class WorkoutGenerator:
         available_exercises = {}
 
         # Get exercises from database
-        all_exercises = await get_exercises_by_muscle_groups(list(self.MUSCLE_GROUPS.keys()))
+        muscle_groups = list(self.MUSCLE_GROUPS.keys())
+        all_exercises = await result_cache.get_or_set(
+            cache_key("generator:exercises", muscle_groups=",".join(muscle_groups)),
+            lambda: get_exercises_by_muscle_groups(muscle_groups),
+            tags=["exercises"]
+        )
 
         for muscle_group in self.MUSCLE_GROUPS.keys():
             exercises = [ex['name'] for ex in all_exercises if ex['muscle_group'] == muscle_group]
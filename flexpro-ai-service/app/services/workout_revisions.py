@@ -0,0 +1,106 @@
+"""
+Workout plan revision history
+Stores plan history as reverse JSON Patches with periodic full snapshots
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sql_models import WorkoutPlan, WorkoutPlanRevision
+from app.services.json_patch import apply_json_patch, make_json_patch
+
+
+def record_revision(db: Session, workout_plan: WorkoutPlan, new_data: Dict[str, Any]) -> None:
+    """
+    Record the plan's current data as a revision before it is replaced
+
+    Must be called before ``workout_plan.data`` is reassigned, while
+    ``workout_plan.version`` still identifies the outgoing version. Every
+    ``WORKOUT_REVISION_SNAPSHOT_INTERVAL``-th revision stores a full snapshot;
+    the rest store a reverse patch from ``new_data`` back to the old data.
+
+    Args:
+        db: Database session
+        workout_plan: Plan about to be updated
+        new_data: Data that will replace the current plan data
+    """
+    old_data = workout_plan.data
+    if old_data == new_data:
+        return
+
+    revision_count = db.query(func.count(WorkoutPlanRevision.id)).filter(
+        WorkoutPlanRevision.workout_plan_id == workout_plan.id
+    ).scalar()
+
+    revision = WorkoutPlanRevision(
+        workout_plan_id=workout_plan.id,
+        version=workout_plan.version
+    )
+    if (revision_count + 1) % settings.WORKOUT_REVISION_SNAPSHOT_INTERVAL == 0:
+        revision.snapshot = old_data
+    else:
+        revision.diff = make_json_patch(new_data, old_data)
+
+    db.add(revision)
+
+
+def list_revisions(db: Session, workout_plan: WorkoutPlan) -> List[Dict[str, Any]]:
+    """
+    List the stored revisions of a plan, newest first
+
+    Only metadata is loaded; snapshots and diffs are never decoded.
+    """
+    rows = db.query(
+        WorkoutPlanRevision.version,
+        WorkoutPlanRevision.snapshot.isnot(None),
+        WorkoutPlanRevision.created_at
+    ).filter(
+        WorkoutPlanRevision.workout_plan_id == workout_plan.id
+    ).order_by(WorkoutPlanRevision.version.desc()).all()
+
+    return [
+        {"version": version, "is_snapshot": bool(is_snapshot), "created_at": created_at}
+        for version, is_snapshot, created_at in rows
+    ]
+
+
+def materialize_revision(db: Session, workout_plan: WorkoutPlan, version: int) -> Dict[str, Any]:
+    """
+    Reconstruct the plan data as it was at a given version
+
+    Starts from the nearest newer snapshot (or the current data) and applies
+    the reverse patches down to the requested version.
+
+    Raises:
+        LookupError: If the version does not exist for this plan
+    """
+    if version == workout_plan.version:
+        return workout_plan.data
+    if version < 1 or version > workout_plan.version:
+        raise LookupError(f"Version {version} not found")
+
+    anchor = db.query(WorkoutPlanRevision).filter(
+        WorkoutPlanRevision.workout_plan_id == workout_plan.id,
+        WorkoutPlanRevision.version >= version,
+        WorkoutPlanRevision.snapshot.isnot(None)
+    ).order_by(WorkoutPlanRevision.version.asc()).first()
+
+    if anchor is not None:
+        data, upper = anchor.snapshot, anchor.version
+    else:
+        data, upper = workout_plan.data, workout_plan.version
+
+    diffs = db.query(WorkoutPlanRevision.diff).filter(
+        WorkoutPlanRevision.workout_plan_id == workout_plan.id,
+        WorkoutPlanRevision.version >= version,
+        WorkoutPlanRevision.version < upper,
+        WorkoutPlanRevision.diff.isnot(None)
+    ).order_by(WorkoutPlanRevision.version.desc()).all()
+
+    for (diff,) in diffs:
+        data = apply_json_patch(data, diff)
+
+    return data
@@ -0,0 +1,73 @@
+"""
+Workout plan statistics
+Precomputed counters stored next to each plan for cheap list views
+"""
+
+import logging
+from typing import Any, Dict, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def compute_plan_stats(data: Dict[str, Any]) -> Tuple[int, int]:
+    """
+    Count training days and exercises in a plan document
+
+    Supports both the frontend layout (``{"days": {1: [...], ...}}``) and the
+    generator layout (``{"workouts": {"day_1": [...], ...}}``).
+
+    Returns:
+        Tuple of (day_count, exercise_count)
+    """
+    if not isinstance(data, dict):
+        return 0, 0
+
+    days = data.get("days")
+    if not isinstance(days, dict):
+        days = data.get("workouts")
+    if not isinstance(days, dict):
+        return 0, 0
+
+    day_count = len(days)
+    exercise_count = sum(len(exercises) for exercises in days.values() if isinstance(exercises, list))
+    return day_count, exercise_count
+
+
+def backfill_plan_stats(db: Session, batch_size: int = 200) -> int:
+    """
+    Compute stats for plans stored before the counters existed
+
+    Uses Core updates so the plan's version and updated_at are untouched.
+
+    Returns:
+        Number of plans updated
+    """
+    from app.models.sql_models import WorkoutPlan
+
+    table = WorkoutPlan.__table__
+    updated = 0
+    while True:
+        rows = db.execute(
+            table.select().with_only_columns(table.c.id, table.c.data)
+            .where(table.c.day_count.is_(None))
+            .limit(batch_size)
+        ).fetchall()
+        if not rows:
+            break
+
+        for plan_id, data in rows:
+            day_count, exercise_count = compute_plan_stats(data)
+            db.execute(
+                update(table)
+                .where(table.c.id == plan_id)
+                .values(day_count=day_count, exercise_count=exercise_count, updated_at=table.c.updated_at)
+            )
+        db.commit()
+        updated += len(rows)
+
+    if updated:
+        logger.info(f"Backfilled stats for {updated} workout plans")
+    return updated
@@ -0,0 +1,536 @@
+"""
+HTTP load benchmark
+Drives realistic traffic mixes against the app on a temporary database and compares with a baseline
+
+The database is created in a temporary directory, migrated and seeded as
+in production, then grown with synthetic copies of the catalogs (--scale)
+and benchmark users (--users). Each virtual user logs in and then runs
+operations picked from the traffic mix until the duration is up.
+
+Usage:
+    python -m benchmarks.http_bench [--transport asgi|uvicorn] [--concurrency 16]
+        [--duration 20] [--mix default] [--scale 5] [--users 50]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--threshold 0.15] [--save-baseline]
+
+Exits with status 1 when a route regressed beyond the threshold.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+BENCH_PASSWORD = "bench-password-123"
+API = "/api/v1"
+
+
+# Sample values for filters and lookups, read from the prepared database
+Catalog = Dict[str, List[Any]]
+
+
+class Recorder:
+    """Latencies and outcomes per route template"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.recording = False
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        if not self.recording:
+            return
+        self.latencies.setdefault(route, []).append(seconds)
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+class VirtualUser:
+    """One simulated client: its own credentials, token, plans and random stream"""
+
+    def __init__(self, index: int, client: httpx.AsyncClient, recorder: Recorder, catalog: Catalog, seed: int):
+        self.username = f"bench-user-{index}"
+        self.client = client
+        self.recorder = recorder
+        self.catalog = catalog
+        self.rng = random.Random(seed + index)
+        self.token: Optional[str] = None
+        self.plan_ids: List[int] = []
+
+    async def request(self, method: str, route: str, expected: Tuple[int, ...] = (200,), **kwargs: Any) -> httpx.Response:
+        """
+        Send a request for ``route`` (a path template) and record it
+
+        Path parameters are passed as ``path_params``; the remaining keyword
+        arguments go to httpx.
+        """
+        path = route.format(**kwargs.pop("path_params", {}))
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(f"{method} {route}", time.perf_counter() - started, ok=False)
+            raise
+        self.recorder.record(f"{method} {route}", time.perf_counter() - started, response.status_code in expected)
+        return response
+
+    def pick(self, name: str) -> Any:
+        return self.rng.choice(self.catalog[name]) if self.catalog.get(name) else None
+
+
+# Operations: one user action, possibly several requests
+
+async def login(user: VirtualUser) -> None:
+    user.token = None
+    response = await user.request(
+        "POST", f"{API}/auth/login", json={"username": user.username, "password": BENCH_PASSWORD}
+    )
+    if response.status_code == 200:
+        user.token = response.json()["access_token"]
+
+
+async def browse_exercises(user: VirtualUser) -> None:
+    choice = user.rng.random()
+    if choice < 0.4:
+        params = {"muscle_group": user.pick("muscle_groups"), "limit": 50}
+    elif choice < 0.7:
+        params = {"search": user.pick("exercise_terms"), "limit": 50}
+    else:
+        params = {"difficulty": user.pick("difficulties"), "skip": user.rng.randrange(0, 200), "limit": 100}
+    await user.request("GET", f"{API}/exercises/", params={k: v for k, v in params.items() if v is not None})
+
+    exercise_id = user.pick("exercise_ids")
+    if exercise_id is not None:
+        await user.request("GET", f"{API}/exercises/{{exercise_id}}", path_params={"exercise_id": exercise_id})
+
+
+async def browse_foods(user: VirtualUser) -> None:
+    if user.rng.random() < 0.5:
+        params = {"category": user.pick("food_categories"), "limit": 50}
+    else:
+        params = {"search": user.pick("food_terms"), "limit": 50}
+    await user.request("GET", f"{API}/foods/", params={k: v for k, v in params.items() if v is not None})
+
+    food_id = user.pick("food_ids")
+    if food_id is not None:
+        await user.request("GET", f"{API}/foods/{{food_id}}", path_params={"food_id": food_id})
+
+
+async def browse_supplements(user: VirtualUser) -> None:
+    choice = user.rng.random()
+    if choice < 0.4:
+        params = {"category": user.pick("supplement_categories")}
+    elif choice < 0.7:
+        params = {"evidence_level": "strong", "min_rating": user.rng.randint(5, 9)}
+    else:
+        params = {"search": user.pick("supplement_terms")}
+    await user.request("GET", f"{API}/supplements/", params={k: v for k, v in params.items() if v is not None})
+
+    if user.rng.random() < 0.3:
+        await user.request("GET", f"{API}/supplements/top-rated/")
+    else:
+        supplement_id = user.pick("supplement_ids")
+        if supplement_id is not None:
+            await user.request(
+                "GET", f"{API}/supplements/{{supplement_id}}", path_params={"supplement_id": supplement_id}
+            )
+
+
+def _plan_document(user: VirtualUser) -> Dict[str, Any]:
+    exercise_ids = user.catalog.get("exercise_ids") or [1]
+    days = {
+        str(day): [
+            {"exercise_id": user.rng.choice(exercise_ids), "sets": user.rng.randint(2, 5), "reps": "8-12"}
+            for _ in range(user.rng.randint(4, 8))
+        ]
+        for day in range(1, user.rng.randint(3, 6) + 1)
+    }
+    return {"days": days, "notes": "benchmark plan"}
+
+
+async def plan_crud(user: VirtualUser) -> None:
+    response = await user.request(
+        "POST", f"{API}/workouts/", expected=(201,),
+        json={"data": _plan_document(user), "plan_name": "Bench plan", "plan_type": "training"},
+    )
+    if response.status_code == 201:
+        user.plan_ids.append(response.json()["id"])
+    if not user.plan_ids:
+        return
+
+    plan_id = user.rng.choice(user.plan_ids)
+    await user.request("GET", f"{API}/workouts/{{workout_id}}", path_params={"workout_id": plan_id})
+    await user.request(
+        "PUT", f"{API}/workouts/{{workout_id}}", path_params={"workout_id": plan_id},
+        json={"data": _plan_document(user), "plan_name": "Bench plan (edited)"},
+    )
+    await user.request("GET", f"{API}/workouts/summaries")
+
+    # Keep each user's plan count bounded so list routes measure the same thing throughout
+    if len(user.plan_ids) > 5:
+        plan_id = user.plan_ids.pop(0)
+        await user.request(
+            "DELETE", f"{API}/workouts/{{workout_id}}", expected=(204,), path_params={"workout_id": plan_id}
+        )
+
+
+async def generate_workout(user: VirtualUser) -> None:
+    profile = {
+        "user_id": user.username,
+        "age": user.rng.randint(18, 60),
+        "gender": user.rng.choice(["male", "female"]),
+        "height": user.rng.randint(155, 195),
+        "weight": user.rng.randint(50, 110),
+        "fitness_level": user.rng.choice(["beginner", "intermediate", "advanced"]),
+        "goal": user.rng.choice(["strength", "hypertrophy", "fat_loss", "maintenance"]),
+        "days_per_week": user.rng.randint(3, 6),
+        "activity_level": user.rng.choice(["light", "moderate", "active"]),
+        "injuries": [],
+        "equipment_access": ["barbell", "dumbbell"],
+    }
+    await user.request("POST", f"{API}/generate/workout", json=profile)
+
+
+Operation = Callable[[VirtualUser], Awaitable[None]]
+
+OPERATIONS: Dict[str, Operation] = {
+    "login": login,
+    "browse_exercises": browse_exercises,
+    "browse_foods": browse_foods,
+    "browse_supplements": browse_supplements,
+    "plan_crud": plan_crud,
+    "generate_workout": generate_workout,
+}
+
+# Traffic mixes: operation -> relative weight
+MIXES: Dict[str, Dict[str, float]] = {
+    "default": {
+        "browse_exercises": 25, "browse_foods": 20, "browse_supplements": 15,
+        "plan_crud": 25, "generate_workout": 10, "login": 5,
+    },
+    "catalog": {"browse_exercises": 40, "browse_foods": 35, "browse_supplements": 25},
+    "auth": {"login": 100},
+    "plans": {"plan_crud": 100},
+    "generation": {"generate_workout": 100},
+}
+
+
+def prepare_data(scale: int, users: int) -> Catalog:
+    """
+    Migrate and seed the database, then add synthetic catalog rows and users
+
+    Must run after DATABASE_PATH points at the benchmark database.
+
+    Returns:
+        Sample values used to build realistic requests
+    """
+    from sqlalchemy import select
+
+    from app.core.auth import get_password_hash
+    from app.db.database import Base, engine
+    from app.db.seed import DATASETS
+    from app.db.startup import prepare_database
+
+    prepare_database()
+
+    with engine.begin() as conn:
+        # Copies of every catalog row under new keys, so filters and searches
+        # scan and return proportionally more data
+        for name, key, _ in DATASETS:
+            table = Base.metadata.tables[name]
+            originals = [dict(row._mapping) for row in conn.execute(select(table))]
+            for copy in range(1, scale):
+                rows = []
+                for original in originals:
+                    row = {k: v for k, v in original.items() if k not in ("id", "created_at", "updated_at")}
+                    row[key] = f"{original[key]}-bench{copy}"
+                    row["name"] = f"{original['name']} {copy}"
+                    rows.append(row)
+                if rows:
+                    conn.execute(table.insert(), rows)
+
+        # One hash for everyone: the same cost per login without hashing N times here
+        password_hash = get_password_hash(BENCH_PASSWORD)
+        users_table = Base.metadata.tables["users"]
+        conn.execute(users_table.insert(), [
+            {"username": f"bench-user-{i}", "email": f"bench-user-{i}@bench.local",
+             "password_hash": password_hash, "full_name": f"Bench User {i}", "role": "client"}
+            for i in range(users)
+        ])
+
+        exercises = Base.metadata.tables["exercises"]
+        foods = Base.metadata.tables["foods"]
+        supplements = Base.metadata.tables["supplements"]
+
+        def values(column) -> List[Any]:
+            return [value for value in conn.execute(select(column).distinct()).scalars() if value]
+
+        def terms(column) -> List[str]:
+            return sorted({str(value).split()[0] for value in values(column)})[:50]
+
+        # Sample from whichever exercises layout is registered
+        if "primary_muscles" in exercises.c:
+            muscle_groups = sorted({
+                muscle for muscles in values(exercises.c.primary_muscles) for muscle in muscles
+            })
+        else:
+            muscle_groups = values(exercises.c.muscle_group)
+
+        return {
+            "exercise_ids": values(exercises.c.id),
+            "muscle_groups": muscle_groups,
+            "difficulties": values(exercises.c.difficulty),
+            "exercise_terms": terms(exercises.c.name),
+            "food_ids": values(foods.c.id),
+            "food_categories": values(foods.c.category),
+            "food_terms": terms(foods.c.name),
+            "supplement_ids": values(supplements.c.id),
+            "supplement_categories": values(supplements.c.category),
+            "supplement_terms": terms(supplements.c.name),
+        }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> Dict[str, Dict[str, float]]:
+    """RPS, error count and latency percentiles (ms) per route"""
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        routes[route] = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(route, 0),
+            "rps": round(len(latencies) / elapsed, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        }
+    return routes
+
+
+async def drive(client: httpx.AsyncClient, catalog: Catalog, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the traffic mix with ``args.concurrency`` virtual users for warmup + duration seconds"""
+    recorder = Recorder()
+    mix = MIXES[args.mix]
+    operations = [OPERATIONS[name] for name in mix]
+    weights = list(mix.values())
+
+    users = [VirtualUser(i % args.users, client, recorder, catalog, args.seed + i) for i in range(args.concurrency)]
+    await asyncio.gather(*(login(user) for user in users))
+
+    stop_at = time.perf_counter() + args.warmup + args.duration
+
+    async def run_user(user: VirtualUser) -> None:
+        while time.perf_counter() < stop_at:
+            operation = user.rng.choices(operations, weights)[0]
+            try:
+                if user.token is None and operation is not login:
+                    await login(user)
+                await operation(user)
+            except httpx.HTTPError:
+                pass  # Already recorded as an error
+
+    async def start_recording() -> float:
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        return time.perf_counter()
+
+    recording_task = asyncio.ensure_future(start_recording())
+    await asyncio.gather(*(run_user(user) for user in users))
+    elapsed = time.perf_counter() - await recording_task
+
+    routes = summarize(recorder, elapsed)
+    requests = sum(route["requests"] for route in routes.values())
+    return {
+        "total": {
+            "requests": requests,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "rps": round(requests / elapsed, 2),
+        },
+        "routes": routes,
+    }
+
+
+async def run_asgi(catalog: Catalog, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark through httpx's in-process ASGI transport, with the app's lifespan"""
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        # Server errors are measured as 500s, like over the network
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            return await drive(client, catalog, args)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_uvicorn(catalog: Catalog, args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark a real uvicorn server over loopback TCP"""
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=os.environ.copy(),
+    )
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+                try:
+                    if (await client.get("/api/v1/health/live")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() >= deadline:
+                    raise RuntimeError("uvicorn did not become ready within 60s")
+                await asyncio.sleep(0.2)
+
+            return await drive(client, catalog, args)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Routes that regressed against the baseline
+
+    A route regresses when its throughput drops, or its p95 latency grows,
+    by more than ``threshold`` (a fraction). Routes missing on either side
+    are not compared.
+    """
+    regressions = []
+    for route, current in results["routes"].items():
+        previous = baseline.get("routes", {}).get(route)
+        if previous is None:
+            continue
+        if previous["rps"] and current["rps"] < previous["rps"] * (1 - threshold):
+            regressions.append(f"{route}: rps {previous['rps']} -> {current['rps']}")
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{route}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+    return regressions
+
+
+def print_table(results: Dict[str, Any]) -> None:
+    print(f"{'route':<55} {'reqs':>7} {'err':>5} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}", file=sys.stderr)
+    for route, stats in results["routes"].items():
+        print(
+            f"{route:<55} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>8.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms",
+            file=sys.stderr,
+        )
+    total = results["total"]
+    print(f"{'total':<55} {total['requests']:>7} {total['errors']:>5} {total['rps']:>9.1f}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the FlexPro API")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--scale", type=int, default=5, help="Catalog size as a multiple of the seed data")
+    parser.add_argument("--users", type=int, default=50, help="Benchmark user accounts")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=0, help="uvicorn port (default: any free port)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the traffic")
+    parser.add_argument("--output", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline results to compare with")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed regression as a fraction")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="flexpro-bench-") as tmp_dir:
+        # Settings are read at import, so configure before any app module loads
+        os.environ["DATABASE_PATH"] = str(Path(tmp_dir) / "flexpro.db")
+        os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        sys.path.insert(0, str(SERVICE_DIR))
+
+        catalog = prepare_data(args.scale, args.users)
+        runner = run_asgi if args.transport == "asgi" else run_uvicorn
+        measured = asyncio.run(runner(catalog, args))
+
+    results = {
+        "meta": {
+            "transport": args.transport,
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "scale": args.scale,
+            "users": args.users,
+            "workers": args.workers if args.transport == "uvicorn" else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        **measured,
+    }
+    print_table(results)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(output + "\n")
+        print(f"Saved baseline to {baseline_path}", file=sys.stderr)
+        return 0
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one", file=sys.stderr)
+        return 0
+
+    baseline = json.loads(baseline_path.read_text())
+    if baseline.get("meta", {}).get("transport") != args.transport or baseline.get("meta", {}).get("mix") != args.mix:
+        print("Baseline was recorded with a different transport or mix; comparison may be misleading", file=sys.stderr)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
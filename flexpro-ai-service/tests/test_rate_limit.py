@@ -0,0 +1,152 @@
+"""
+Rate limiting tests
+Token buckets on both backends and the middleware's 429 responses
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import InMemoryBackend, RateLimitMiddleware, RedisBackend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def redis_backend():
+    return RedisBackend(fakeredis.FakeAsyncRedis())
+
+
+@pytest.mark.asyncio
+async def test_memory_burst_up_to_capacity(clock):
+    backend = InMemoryBackend()
+    results = [await backend.consume("ip:1", capacity=3, refill_rate=1.0) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert results[2].remaining == 0
+    assert results[3].retry_after == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_memory_refill(clock):
+    backend = InMemoryBackend()
+    for _ in range(2):
+        await backend.consume("ip:1", capacity=2, refill_rate=0.5)
+    assert not (await backend.consume("ip:1", capacity=2, refill_rate=0.5)).allowed
+
+    clock.now += 2
+    assert (await backend.consume("ip:1", capacity=2, refill_rate=0.5)).allowed
+    assert not (await backend.consume("ip:1", capacity=2, refill_rate=0.5)).allowed
+
+    # Refill never goes past capacity
+    clock.now += 3600
+    results = [await backend.consume("ip:1", capacity=2, refill_rate=0.5) for _ in range(3)]
+    assert [result.allowed for result in results] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_memory_keys_are_independent(clock):
+    backend = InMemoryBackend(shards=1)
+    assert (await backend.consume("ip:1", capacity=1, refill_rate=1.0)).allowed
+    assert not (await backend.consume("ip:1", capacity=1, refill_rate=1.0)).allowed
+    assert (await backend.consume("ip:2", capacity=1, refill_rate=1.0)).allowed
+
+
+@pytest.mark.asyncio
+async def test_redis_burst_up_to_capacity(redis_backend):
+    results = [await redis_backend.consume("ip:1", capacity=3, refill_rate=0.01) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert results[3].retry_after > 0
+
+
+@pytest.mark.asyncio
+async def test_redis_refill(redis_backend):
+    for _ in range(2):
+        await redis_backend.consume("ip:1", capacity=2, refill_rate=20.0)
+    assert not (await redis_backend.consume("ip:1", capacity=2, refill_rate=20.0)).allowed
+
+    await asyncio.sleep(0.1)
+    assert (await redis_backend.consume("ip:1", capacity=2, refill_rate=20.0)).allowed
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable_allows_requests():
+    server = fakeredis.FakeServer()
+    backend = RedisBackend(fakeredis.FakeAsyncRedis(server=server))
+    server.connected = False
+
+    results = [await backend.consume("ip:1", capacity=1, refill_rate=0.01) for _ in range(3)]
+    assert all(result.allowed for result in results)
+
+
+def _client(monkeypatch, backend, routes=None):
+    monkeypatch.setattr(settings, "RATE_LIMIT_REQUESTS", 3)
+    monkeypatch.setattr(settings, "RATE_LIMIT_WINDOW", 60)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ROUTES", routes or {})
+
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/items", ok), Route("/login", ok), Route("/api/v1/health", ok)])
+    app.add_middleware(RateLimitMiddleware, backend=backend)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("backend_factory", [InMemoryBackend, lambda: RedisBackend(fakeredis.FakeAsyncRedis())])
+def test_middleware_rejects_with_retry_after(monkeypatch, backend_factory):
+    client = _client(monkeypatch, backend_factory())
+
+    for remaining in ("2", "1", "0"):
+        response = client.get("/items")
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-limit"] == "3"
+        assert response.headers["x-ratelimit-remaining"] == remaining
+
+    response = client.get("/items")
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Rate limit exceeded"}
+    assert response.headers["retry-after"] == "20"
+    assert response.headers["x-ratelimit-remaining"] == "0"
+
+
+def test_middleware_route_limit(monkeypatch):
+    client = _client(monkeypatch, InMemoryBackend(), routes={"/login": 1})
+
+    assert client.get("/login").status_code == 200
+    response = client.get("/login")
+    assert response.status_code == 429
+    assert response.headers["x-ratelimit-limit"] == "1"
+    assert response.headers["retry-after"] == "60"
+
+    # The stricter bucket is per route; the caller's default bucket still has room
+    assert client.get("/items").status_code == 200
+
+
+def test_middleware_exempt_paths(monkeypatch):
+    client = _client(monkeypatch, InMemoryBackend())
+
+    for _ in range(5):
+        response = client.get("/api/v1/health")
+        assert response.status_code == 200
+        assert "x-ratelimit-limit" not in response.headers